@@ -0,0 +1,339 @@
+"""BMW Sales Data - Approximate Queries"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+
+from sketches import KLLSketch, group_sketches
+
+
+# Each Model x Region combination keeps its own reservoir
+STRATA = ['Model', 'Region']
+
+
+class StratifiedReservoir:
+    def __init__(self, size=200, strata=None, seed=42):
+        self.size = size
+        self.strata = STRATA if strata is None else list(strata)
+        self.rng = np.random.default_rng(seed)
+        self.counts = {}
+        self.samples = {}
+        self.source = None
+        self._sample = None
+
+    @classmethod
+    def from_csv(cls, path, size=200, chunksize=100000, **kwargs):
+        reservoir = cls(size=size, **kwargs)
+        for chunk in pd.read_csv(path, chunksize=chunksize):
+            reservoir.update(chunk)
+        return reservoir
+
+    # Algorithm R per stratum, vectorized over each chunk's rows
+    def update(self, chunk):
+        for key, group in chunk.groupby(self.strata, sort=False, observed=True):
+            group = group.reset_index(drop=True)
+            seen = self.counts.get(key, 0)
+            current = self.samples.get(key, group.iloc[:0])
+
+            # Fill the reservoir first
+            fill = min(self.size - len(current), len(group))
+            if fill > 0:
+                current = pd.concat([current, group.iloc[:fill]], ignore_index=True)
+
+            rest = group.iloc[fill:]
+            if len(rest) > 0:
+                # Row t (0-based position in the stream) replaces slot j ~ U[0, t] if j < size
+                positions = seen + fill + np.arange(len(rest))
+                slots = self.rng.integers(0, positions + 1)
+                accepted = np.flatnonzero(slots < self.size)
+
+                if len(accepted) > 0:
+                    # Later rows overwrite earlier ones, as in the sequential algorithm
+                    slots = slots[accepted]
+                    _, last = np.unique(slots[::-1], return_index=True)
+                    winners = accepted[len(accepted) - 1 - last]
+
+                    order = np.arange(len(current))
+                    order[slots[len(accepted) - 1 - last]] = len(current) + winners
+                    combined = pd.concat([current, rest], ignore_index=True)
+                    current = combined.iloc[order].reset_index(drop=True)
+
+            self.samples[key] = current
+            self.counts[key] = seen + len(group)
+        self._sample = None
+
+    # Samples as Parquet rows tagged with their stratum; size, strata, stream counts and RNG
+    # state go in the file's metadata as JSON, so a loaded reservoir keeps sampling where it
+    # stopped. Written beside the final path and renamed in, so readers never see a partial file.
+    def save(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Saving a reservoir needs pyarrow: pip install pyarrow")
+
+        state = {
+            'size': self.size,
+            'strata': self.strata,
+            'rng': self.rng.bit_generator.state,
+            'counts': [[list(key), count] for key, count in self.counts.items()],
+            'source': self.source
+        }
+        table = pa.Table.from_pandas(self.sample().drop(columns=['_N', '_weight'], errors='ignore'),
+                                     preserve_index=False)
+        metadata = {**(table.schema.metadata or {}), b'reservoir': json.dumps(state).encode('utf-8')}
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        building = f'{path}.{os.getpid()}.tmp'
+        pq.write_table(table.replace_schema_metadata(metadata), building)
+        os.replace(building, path)
+
+    @classmethod
+    def load(cls, path):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Loading a reservoir needs pyarrow: pip install pyarrow")
+
+        table = pq.read_table(path)
+        state = json.loads(table.schema.metadata[b'reservoir'].decode('utf-8'))
+        reservoir = cls(size=state['size'], strata=state['strata'])
+        reservoir.rng.bit_generator.state = state['rng']
+        reservoir.source = state['source']
+
+        # Strata come back in the order they were saved, which is the order sample() stacks them
+        rows = table.to_pandas()
+        keys = [tuple(key) for key, _ in state['counts']]
+        reservoir.counts = {key: count for key, (_, count) in zip(keys, state['counts'])}
+        if len(keys) > 0:
+            groups = rows.groupby('_stratum', sort=True).indices
+            reservoir.samples = {
+                key: rows.iloc[groups[stratum_id]].drop(columns='_stratum').reset_index(drop=True)
+                for stratum_id, key in enumerate(keys)
+            }
+        return reservoir
+
+    @property
+    def population(self):
+        return sum(self.counts.values())
+
+    # All samples stacked, with each row's stratum id and sampling weight N_h / n_h.
+    # Built once and reused by every estimate until the reservoir is updated.
+    def sample(self):
+        if self._sample is not None:
+            return self._sample
+        frames = []
+        for stratum_id, (key, rows) in enumerate(self.samples.items()):
+            rows = rows.copy()
+            rows['_stratum'] = stratum_id
+            rows['_N'] = self.counts[key]
+            rows['_weight'] = self.counts[key] / len(rows)
+            frames.append(rows)
+        self._sample = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        return self._sample
+
+    def mean(self, column, by=None, confidence=0.95):
+        return self._by_domain(self._mean, column, by, confidence)
+
+    def sum(self, column, by=None, confidence=0.95):
+        return self._by_domain(self._sum, column, by, confidence)
+
+    def count(self, column, by=None, confidence=0.95):
+        return self._by_domain(self._count, column, by, confidence)
+
+    def std(self, column, by=None, confidence=0.95):
+        return self._by_domain(self._std, column, by, confidence)
+
+    def quantile(self, column, q=0.5, by=None, confidence=0.95):
+        def estimator(sample, y, in_domain, z):
+            return self._quantile(sample, y, in_domain, z, q)
+        return self._by_domain(estimator, column, by, confidence)
+
+    def _by_domain(self, estimator, column, by, confidence):
+        sample = self.sample()
+        y = sample[column].to_numpy(dtype=float)
+        z = norm.ppf(0.5 + confidence / 2)
+
+        if by is None:
+            in_domain = np.ones(len(sample), dtype=bool)
+            return pd.Series(estimator(sample, y, in_domain, z),
+                             index=['estimate', 'ci_low', 'ci_high'])
+
+        rows = {}
+        for value, domain in sample.groupby(by, observed=True).indices.items():
+            in_domain = np.zeros(len(sample), dtype=bool)
+            in_domain[domain] = True
+            rows[value] = estimator(sample, y, in_domain, z)
+
+        result = pd.DataFrame.from_dict(rows, orient='index',
+                                        columns=['estimate', 'ci_low', 'ci_high'])
+        result.index.name = by
+        return result.sort_index()
+
+    # Stratified estimate of a population total and its variance
+    def _total(self, sample, values):
+        grouped = pd.DataFrame({'_stratum': sample['_stratum'], 'v': values}).groupby('_stratum')['v']
+        n = grouped.size()
+        N = sample.groupby('_stratum')['_N'].first()
+        total = (N * grouped.mean()).sum()
+        variance = (N ** 2 * (1 - n / N) * grouped.var(ddof=1).fillna(0) / n).sum()
+        return total, variance
+
+    def _sum(self, sample, y, in_domain, z):
+        total, variance = self._total(sample, np.where(in_domain, y, 0.0))
+        margin = z * np.sqrt(variance)
+        return total, total - margin, total + margin
+
+    def _count(self, sample, y, in_domain, z):
+        total, variance = self._total(sample, in_domain.astype(float))
+        margin = z * np.sqrt(variance)
+        return total, total - margin, total + margin
+
+    # Domain mean as a ratio estimator with linearized variance
+    def _mean(self, sample, y, in_domain, z):
+        y_total, _ = self._total(sample, np.where(in_domain, y, 0.0))
+        n_total, _ = self._total(sample, in_domain.astype(float))
+        ratio = y_total / n_total
+        _, variance = self._total(sample, np.where(in_domain, y - ratio, 0.0))
+        margin = z * np.sqrt(variance) / n_total
+        return ratio, ratio - margin, ratio + margin
+
+    # Domain standard deviation (ddof=1) from a ratio estimate of the variance;
+    # the interval maps the variance's linearized standard error through the square root
+    def _std(self, sample, y, in_domain, z):
+        mean, _, _ = self._mean(sample, y, in_domain, z)
+        squares = (y - mean) ** 2
+        n_total, _ = self._total(sample, in_domain.astype(float))
+        ss_total, _ = self._total(sample, np.where(in_domain, squares, 0.0))
+        variance = ss_total / n_total
+        _, variance_var = self._total(sample, np.where(in_domain, squares - variance, 0.0))
+
+        std = np.sqrt(variance * n_total / (n_total - 1))
+        margin = z * np.sqrt(variance_var) / n_total / (2 * std)
+        return std, max(std - margin, 0.0), std + margin
+
+    # Weighted quantile with a Woodruff interval from the CDF's standard error
+    def _quantile(self, sample, y, in_domain, z, q):
+        values = y[in_domain]
+        weights = sample['_weight'].to_numpy()[in_domain]
+        estimate = _weighted_quantile(values, weights, q)
+
+        n_total, _ = self._total(sample, in_domain.astype(float))
+        below = (y <= estimate).astype(float)
+        _, variance = self._total(sample, np.where(in_domain, below - q, 0.0))
+        margin = z * np.sqrt(variance) / n_total
+
+        low = _weighted_quantile(values, weights, max(q - margin, 0.0))
+        high = _weighted_quantile(values, weights, min(q + margin, 1.0))
+        return estimate, low, high
+
+
+# Identifies a data file by path, size and modification time. A directory (column store or
+# partitioned dataset) is identified by every file under it, since rewriting a file in a
+# subdirectory does not change the directory's own modification time.
+def _source_stamp(path):
+    if not os.path.isdir(path):
+        stat = os.stat(path)
+        return f'{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}'
+    digest = hashlib.sha256()
+    for directory, _, files in sorted(os.walk(path)):
+        for name in sorted(files):
+            stat = os.stat(os.path.join(directory, name))
+            digest.update(f'{os.path.relpath(directory, path)}/{name}|{stat.st_size}|{stat.st_mtime_ns}\n'.encode())
+    return f'{os.path.abspath(path)}|{digest.hexdigest()}'
+
+
+# Reservoir stored at path for the given source, rebuilt from chunks (an iterable of
+# DataFrames read from source, after any filters) only when the source, the filters or
+# the sample size has changed
+def open_reservoir(path, source, chunks, size=200, filters=None):
+    stamp = _source_stamp(source)
+    if filters:
+        stamp = f'{stamp}|{filters!r}'
+    if os.path.exists(path):
+        reservoir = StratifiedReservoir.load(path)
+        if reservoir.source == stamp and reservoir.size == size:
+            return reservoir
+
+    reservoir = StratifiedReservoir(size=size)
+    for chunk in chunks:
+        reservoir.update(chunk)
+    reservoir.source = stamp
+    reservoir.save(path)
+    return reservoir
+
+
+def _weighted_quantile(values, weights, q):
+    order = np.argsort(values)
+    cumulative = np.cumsum(weights[order])
+    position = np.searchsorted(cumulative, q * cumulative[-1])
+    return values[order][min(position, len(values) - 1)]
+
+
+# Exact groupby aggregate, or an estimate from the reservoir when one is given.
+# With sketch=True, medians and quantiles come from mergeable KLL sketches instead.
+# A lazy backend computes the exact aggregate out of core (df is then its lazy frame).
+def aggregate(df, column, how, by=None, reservoir=None, q=0.5, confidence=0.95, sketch=False,
+              backend=None):
+    if how == 'median':
+        how, q = 'quantile', 0.5
+
+    if reservoir is not None:
+        if how == 'quantile':
+            return reservoir.quantile(column, q=q, by=by, confidence=confidence)
+        return getattr(reservoir, how)(column, by=by, confidence=confidence)
+
+    if backend is not None and backend.lazy:
+        spec = {'estimate': (column, how, q) if how == 'quantile' else (column, how)}
+        if by is None:
+            estimate = backend.aggregate(df, spec)['estimate']
+        else:
+            estimate = backend.groupby_agg(df, by, spec)['estimate']
+    elif sketch and how == 'quantile':
+        return _sketch_quantile(df, column, by, q)
+    else:
+        data = df[column] if by is None else df.groupby(by)[column]
+        if how == 'quantile':
+            estimate = data.quantile(q)
+        else:
+            estimate = data.agg(how)
+
+    if by is None:
+        return pd.Series([estimate] * 3, index=['estimate', 'ci_low', 'ci_high'])
+    return pd.DataFrame({'estimate': estimate, 'ci_low': estimate, 'ci_high': estimate})
+
+
+# KLL quantile with bounds taken from the sketch's rank error
+def _sketch_quantile(df, column, by, q):
+    if by is None:
+        sketches = {None: KLLSketch().update(df[column].to_numpy())}
+    else:
+        sketches = group_sketches(df, column, by)
+
+    rows = {}
+    for key, sketch in sketches.items():
+        error = sketch.rank_error()
+        rows[key] = sketch.quantile([q, max(q - error, 0.0), min(q + error, 1.0)])
+
+    result = pd.DataFrame.from_dict(rows, orient='index', columns=['estimate', 'ci_low', 'ci_high'])
+    if by is None:
+        return result.iloc[0]
+    result.index.name = by
+    return result.sort_index()
+
+
+# Several aggregates side by side, with interval columns in approximate mode
+def summarize(df, column, hows, by, reservoir=None, confidence=0.95, sketch=False, backend=None):
+    columns = {}
+    for how in hows:
+        result = aggregate(df, column, how, by=by, reservoir=reservoir, confidence=confidence,
+                           sketch=sketch, backend=backend)
+        columns[how] = result['estimate']
+        if reservoir is not None:
+            columns[f'{how}_ci_low'] = result['ci_low']
+            columns[f'{how}_ci_high'] = result['ci_high']
+    return pd.DataFrame(columns)
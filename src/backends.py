@@ -0,0 +1,361 @@
+"""BMW Sales Data - Execution Backends"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from features import CURRENT_YEAR, FEATURE_BINS, add_features
+from filters import COMPARISONS, apply_filters, check_filters
+from partitioned_store import read_partitioned, stored_columns
+
+
+def _is_parquet(path):
+    return path.endswith('.parquet') or os.path.isdir(path)
+
+
+# Pandas aggregation names that Polars spells differently
+POLARS_AGGS = {'nunique': 'n_unique'}
+
+
+# Aggregations are (column, how) or (column, how, *args), e.g. ('Price_USD', 'quantile', 0.25)
+def _pandas_agg(spec):
+    column, how, *args = spec
+    if not args:
+        return column, how
+    return column, lambda values: getattr(values, how)(*args)
+
+
+# Matplotlib box-plot statistics: quartiles, whiskers at the most extreme values
+# within 1.5 IQR of the box, and the values beyond them as fliers
+def _box_stats(values):
+    q1, med, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+    within = (values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)
+    inside = values[within]
+    return {'q1': q1, 'med': med, 'q3': q3, 'whislo': inside.min(), 'whishi': inside.max(),
+            'fliers': values[~within]}
+
+
+class PandasBackend:
+    name = 'pandas'
+    lazy = False
+
+    # Parquet reads push columns and filters down into pyarrow, partitioned
+    # directories skip pruned partitions, CSV reads prune columns only
+    def scan(self, path, columns=None, filters=None):
+        check_filters(filters)
+        if os.path.isdir(path):
+            return read_partitioned(path, columns=columns, filters=filters)
+        if _is_parquet(path):
+            return pd.read_parquet(path, columns=columns, filters=filters or None)
+        return self.filter(pd.read_csv(path, usecols=columns), filters)
+
+    def filter(self, frame, filters):
+        return apply_filters(frame, filters)
+
+    def with_features(self, frame):
+        return add_features(frame)
+
+    def drop_duplicates(self, frame):
+        return frame.drop_duplicates()
+
+    # aggs maps output name -> (column, how), as in DataFrame.groupby().agg(**aggs)
+    def groupby_agg(self, frame, by, aggs):
+        aggs = {name: _pandas_agg(spec) for name, spec in aggs.items()}
+        return frame.groupby(by, observed=True).agg(**aggs)
+
+    # Whole-frame aggregates as one Series, with the same aggs as groupby_agg()
+    def aggregate(self, frame, aggs):
+        return pd.Series({name: getattr(frame[column], how)(*args)
+                          for name, (column, how, *args) in aggs.items()})
+
+    def pivot_table(self, frame, values, index, columns, aggfunc='mean'):
+        return frame.pivot_table(values=values, index=index, columns=columns, aggfunc=aggfunc)
+
+    def head(self, frame, n=5):
+        return frame.head(n)
+
+    def tail(self, frame, n=5):
+        return frame.tail(n)
+
+    def shape(self, frame):
+        return frame.shape
+
+    def dtypes(self, frame):
+        return frame.dtypes
+
+    def numeric_columns(self, frame):
+        return list(frame.select_dtypes(include=[np.number]).columns)
+
+    def string_columns(self, frame):
+        return list(frame.select_dtypes(include='object').columns)
+
+    def value_counts(self, frame, column):
+        return frame[column].value_counts()
+
+    def unique(self, frame, column):
+        return frame[column].unique()
+
+    def null_counts(self, frame):
+        return frame.isnull().sum()
+
+    def count_duplicates(self, frame):
+        return int(frame.duplicated().sum())
+
+    def describe(self, frame, include=None):
+        return frame.describe(include=include)
+
+    def corr(self, frame, columns):
+        return frame[columns].corr()
+
+    # Bin counts (one column per group when by is given) and the shared bin edges
+    def histogram(self, frame, column, bins=30, by=None):
+        edges = np.histogram_bin_edges(frame[column], bins=bins)
+        if by is None:
+            return pd.Series(np.histogram(frame[column], bins=edges)[0]), edges
+        counts = {key: np.histogram(values, bins=edges)[0]
+                  for key, values in frame.groupby(by, observed=True)[column]}
+        return pd.DataFrame(counts), edges
+
+    # One row of box-plot statistics per group, for Axes.bxp()
+    def box_stats(self, frame, column, by):
+        rows = {key: _box_stats(values.to_numpy())
+                for key, values in frame.groupby(by, observed=True)[column]}
+        result = pd.DataFrame.from_dict(rows, orient='index')
+        result.index.name = by
+        return result
+
+    def iter_chunks(self, frame, columns=None, chunksize=100000):
+        if columns is not None:
+            frame = frame[columns]
+        for start in range(0, len(frame), chunksize):
+            yield frame.iloc[start:start + chunksize]
+
+    def collect(self, frame):
+        return frame
+
+    def write_parquet(self, frame, path):
+        frame.to_parquet(path, index=False)
+
+    def write_csv(self, frame, path):
+        frame.to_csv(path, index=False)
+
+
+class PolarsBackend:
+    name = 'polars'
+    lazy = True
+
+    def __init__(self, streaming=True):
+        try:
+            import polars as pl
+        except ImportError:
+            raise ImportError("The polars backend needs polars: pip install polars")
+        self.pl = pl
+        self.engine = 'streaming' if streaming else 'auto'
+
+    # Nothing is read here; Polars pushes the filters and projection into the scan
+    def scan(self, path, columns=None, filters=None):
+        pl = self.pl
+        if os.path.isdir(path):
+            frame = pl.scan_parquet(os.path.join(path, '**', '*.parquet'), hive_partitioning=True)
+            # Hive columns come last; restore the order the dataset was written in
+            if columns is None:
+                columns = stored_columns(path)
+        elif _is_parquet(path):
+            frame = pl.scan_parquet(path)
+        else:
+            frame = pl.scan_csv(path)
+        frame = self.filter(frame, filters)
+        if columns is not None:
+            frame = frame.select(columns)
+        return frame
+
+    def filter(self, frame, filters):
+        check_filters(filters)
+        pl = self.pl
+        for column, op, value in filters or []:
+            if op == 'in':
+                frame = frame.filter(pl.col(column).is_in(list(value)))
+            else:
+                frame = frame.filter(COMPARISONS[op](pl.col(column), value))
+        return frame
+
+    # Same features as features.add_features(), as lazy expressions
+    def with_features(self, frame):
+        pl = self.pl
+        series = pl.col('Model').str.extract(r'(\d)', 1).cast(pl.Int64)
+        vehicle_age = pl.lit(CURRENT_YEAR) - pl.col('Year')
+
+        return frame.with_columns(
+            vehicle_age.alias('Vehicle_Age'),
+            self._cut(pl.col('Price_USD'), 'Price_Category'),
+            self._cut(pl.col('Mileage_KM'), 'Mileage_Category'),
+            self._cut(series, 'Model_Category'),
+            self._cut(vehicle_age, 'Age_Group'),
+            (pl.col('Sales_Volume') / pl.col('Price_USD') * 1000).round(2).alias('Sales_per_Price'),
+            (pl.col('Fuel_Type') == 'Electric').cast(pl.Int64).alias('Is_Electric')
+        )
+
+    # Right-closed bins like pd.cut; values outside every bin become null
+    def _cut(self, expr, name):
+        pl = self.pl
+        bins, labels = FEATURE_BINS[name]
+        result = pl.lit(None, dtype=pl.Utf8)
+        for low, high, label in reversed(list(zip(bins[:-1], bins[1:], labels))):
+            result = pl.when((expr > low) & (expr <= high)).then(pl.lit(label)).otherwise(result)
+        return result.cast(pl.Enum(labels)).alias(name)
+
+    def drop_duplicates(self, frame):
+        return frame.unique(maintain_order=True)
+
+    # Pandas aggregation names as Polars expressions; quantiles interpolate like pandas
+    def _expr(self, column, how, *args):
+        pl = self.pl
+        how = POLARS_AGGS.get(how, how)
+        if how == 'quantile':
+            return pl.col(column).quantile(*args, interpolation='linear')
+        return getattr(pl.col(column), how)(*args)
+
+    # Aggregates run lazily; only the (small) result is collected into pandas
+    def groupby_agg(self, frame, by, aggs):
+        by = [by] if isinstance(by, str) else list(by)
+        exprs = [self._expr(*spec).alias(name) for name, spec in aggs.items()]
+        result = frame.group_by(by).agg(exprs).sort(by)
+        return self.collect(result).set_index(by)
+
+    def aggregate(self, frame, aggs):
+        exprs = [self._expr(*spec).alias(name) for name, spec in aggs.items()]
+        return self.collect(frame.select(exprs)).iloc[0]
+
+    def pivot_table(self, frame, values, index, columns, aggfunc='mean'):
+        pl = self.pl
+        cells = frame.group_by([index, columns]).agg(getattr(pl.col(values), aggfunc)())
+        cells = self.collect(cells)
+        return cells.pivot_table(values=values, index=index, columns=columns, aggfunc='first')
+
+    def head(self, frame, n=5):
+        return self.collect(frame.head(n))
+
+    def tail(self, frame, n=5):
+        return self.collect(frame.tail(n))
+
+    def shape(self, frame):
+        rows = frame.select(self.pl.len()).collect(engine=self.engine).item()
+        return rows, len(frame.collect_schema())
+
+    def dtypes(self, frame):
+        return pd.Series({name: str(dtype) for name, dtype in frame.collect_schema().items()})
+
+    def numeric_columns(self, frame):
+        return [name for name, dtype in frame.collect_schema().items() if dtype.is_numeric()]
+
+    def string_columns(self, frame):
+        return [name for name, dtype in frame.collect_schema().items() if dtype == self.pl.String]
+
+    def value_counts(self, frame, column):
+        pl = self.pl
+        counts = frame.group_by(column).agg(pl.len().cast(pl.Int64).alias('count'))
+        counts = counts.sort(['count', column], descending=[True, False])
+        return self.collect(counts).set_index(column)['count']
+
+    def unique(self, frame, column):
+        values = frame.select(self.pl.col(column).unique(maintain_order=True))
+        return self.collect(values)[column].to_numpy()
+
+    def null_counts(self, frame):
+        return self.collect(frame.null_count()).iloc[0]
+
+    def count_duplicates(self, frame):
+        rows, _ = self.shape(frame)
+        distinct, _ = self.shape(frame.unique())
+        return rows - distinct
+
+    # Same layout as DataFrame.describe(); include='object' summarizes the string columns
+    def describe(self, frame, include=None):
+        if include == 'object':
+            rows = {}
+            for column in self.string_columns(frame):
+                counts = self.value_counts(frame, column)
+                rows[column] = [counts.sum(), len(counts), counts.index[0], counts.iloc[0]]
+            return pd.DataFrame(rows, index=['count', 'unique', 'top', 'freq'])
+
+        stats = [('count', 'count'), ('mean', 'mean'), ('std', 'std'), ('min', 'min'),
+                 ('25%', 'quantile', 0.25), ('50%', 'quantile', 0.5), ('75%', 'quantile', 0.75),
+                 ('max', 'max')]
+        columns = self.numeric_columns(frame)
+        exprs = [self._expr(column, *spec).cast(self.pl.Float64).alias(f'{column}|{label}')
+                 for column in columns for label, *spec in stats]
+        row = self.collect(frame.select(exprs)).iloc[0]
+        return pd.DataFrame({column: [row[f'{column}|{label}'] for label, *_ in stats] for column in columns},
+                            index=[label for label, *_ in stats])
+
+    def corr(self, frame, columns):
+        pl = self.pl
+        exprs = [pl.corr(a, b).alias(f'{a}|{b}') for a in columns for b in columns]
+        row = self.collect(frame.select(exprs)).iloc[0]
+        return pd.DataFrame([[row[f'{a}|{b}'] for b in columns] for a in columns],
+                            index=columns, columns=columns)
+
+    # Equal-width bins like np.histogram (last bin closed), counted by a lazy group-by
+    def histogram(self, frame, column, bins=30, by=None):
+        pl = self.pl
+        bounds = self.aggregate(frame, {'low': (column, 'min'), 'high': (column, 'max')})
+        edges = np.histogram_bin_edges([bounds['low'], bounds['high']], bins=bins)
+
+        width = (edges[-1] - edges[0]) / bins or 1.0
+        bin_id = ((pl.col(column) - edges[0]) / width).floor().clip(0, bins - 1).cast(pl.Int64)
+        keys = ['_bin'] if by is None else ['_bin', by]
+        counts = self.collect(frame.group_by(bin_id.alias('_bin'), *keys[1:]).agg(pl.len().alias('count')))
+
+        if by is None:
+            return counts.set_index('_bin')['count'].reindex(range(bins), fill_value=0), edges
+        counts = counts.pivot_table(values='count', index='_bin', columns=by, aggfunc='sum', observed=True)
+        return counts.reindex(range(bins)).fillna(0).astype(int), edges
+
+    # Quartiles per group, then a second lazy pass for the whisker ends and the fliers
+    # (only the values outside the whiskers are collected)
+    def box_stats(self, frame, column, by):
+        pl = self.pl
+        value = pl.col(column)
+        quartiles = frame.group_by(by).agg(
+            self._expr(column, 'quantile', 0.25).alias('q1'),
+            value.median().alias('med'),
+            self._expr(column, 'quantile', 0.75).alias('q3')
+        )
+        iqr = pl.col('q3') - pl.col('q1')
+        within = (value >= pl.col('q1') - 1.5 * iqr) & (value <= pl.col('q3') + 1.5 * iqr)
+        rows = frame.join(quartiles, on=by)
+        whiskers = rows.filter(within).group_by(by).agg(value.min().alias('whislo'), value.max().alias('whishi'))
+        fliers = rows.filter(~within).group_by(by).agg(value.alias('fliers'))
+        result = self.collect(quartiles.join(whiskers, on=by).join(fliers, on=by, how='left').sort(by)).set_index(by)
+        result['fliers'] = [np.asarray([] if values is None else values, dtype=float) for values in result['fliers']]
+        return result
+
+    # Streams bounded pandas chunks for consumers that fold data chunk by chunk
+    def iter_chunks(self, frame, columns=None, chunksize=100000):
+        if columns is not None:
+            frame = frame.select(columns)
+        for batch in frame.collect_batches(chunk_size=chunksize, engine=self.engine):
+            yield batch.to_pandas()
+
+    def collect(self, frame):
+        return frame.collect(engine=self.engine).to_pandas()
+
+    def write_parquet(self, frame, path):
+        frame.sink_parquet(path)
+
+    def write_csv(self, frame, path):
+        frame.sink_csv(path)
+
+
+BACKENDS = {
+    'pandas': PandasBackend,
+    'polars': PolarsBackend
+}
+
+
+def get_backend(name='pandas', **kwargs):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend '{name}'. Choose from: {', '.join(BACKENDS)}")
+    return BACKENDS[name](**kwargs)
@@ -0,0 +1,69 @@
+"""BMW Sales Data - Bitmap Index"""
+
+import numpy as np
+import pandas as pd
+
+
+# Categorical dimensions that get one bitmap per distinct value
+INDEX_COLUMNS = ['Model', 'Region', 'Color', 'Fuel_Type', 'Transmission',
+                 'Sales_Classification', 'Year']
+
+
+class BitmapIndex:
+    def __init__(self, df, columns=None):
+        self.n_rows = len(df)
+        self.n_bytes = (self.n_rows + 7) // 8
+        self.bitmaps = {}
+
+        columns = INDEX_COLUMNS if columns is None else columns
+
+        for col in columns:
+            if col not in df.columns:
+                continue
+
+            # Factorize once so each bitmap is built from integer codes, not strings
+            codes, uniques = pd.factorize(df[col], sort=True)
+            self.bitmaps[col] = {
+                value: np.packbits(codes == code)
+                for code, value in enumerate(uniques.tolist())
+            }
+
+    def values(self, column):
+        return list(self.bitmaps[column].keys())
+
+    def empty(self):
+        return np.zeros(self.n_bytes, dtype=np.uint8)
+
+    def full(self):
+        return np.packbits(np.ones(self.n_rows, dtype=bool))
+
+    def bitmap(self, column, value):
+        bits = self.bitmaps[column].get(value)
+        return self.empty() if bits is None else bits
+
+    # OR together the bitmaps of several values of one column
+    def any_of(self, column, values):
+        bits = self.empty()
+        for value in values:
+            bits = bits | self.bitmap(column, value)
+        return bits
+
+    # AND across columns; a list/tuple/set of values is OR-ed within its column
+    def where(self, **filters):
+        bits = self.full()
+        for column, value in filters.items():
+            if isinstance(value, (list, tuple, set, pd.Index, np.ndarray)):
+                bits = bits & self.any_of(column, value)
+            else:
+                bits = bits & self.bitmap(column, value)
+        return bits
+
+    def mask(self, bits):
+        return np.unpackbits(bits, count=self.n_rows).astype(bool)
+
+    def count(self, bits):
+        return int(np.unpackbits(bits, count=self.n_rows).sum())
+
+    # Rows of df matching all filters; df must be the frame the index was built on
+    def subset(self, df, **filters):
+        return df[self.mask(self.where(**filters))]
@@ -0,0 +1,110 @@
+"""BMW Sales Data - Memory-Mapped Column Store"""
+
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+
+# Layout: one .npy file per column plus meta.json holding the row count and
+# the categorical dictionaries, so every process shares one copy of the data
+META_FILE = 'meta.json'
+
+
+def _is_categorical(series):
+    return isinstance(series.dtype, pd.CategoricalDtype) or not pd.api.types.is_numeric_dtype(series)
+
+
+# df is a DataFrame or an iterable of (name, Series) pairs, so a lazy backend can
+# collect and write one column at a time
+def _write_columns(df, path):
+    os.makedirs(path, exist_ok=True)
+    columns = []
+    n_rows = len(df) if isinstance(df, pd.DataFrame) else 0
+
+    for name, series in (df.items() if isinstance(df, pd.DataFrame) else df):
+        n_rows = len(series)
+        if _is_categorical(series):
+            # Store integer codes; the dictionary is written once in meta.json
+            categorical = pd.Categorical(series)
+            codes = categorical.codes
+            values = codes.astype(np.int8 if len(categorical.categories) < 127 else np.int32)
+            columns.append({
+                'name': name,
+                'kind': 'categorical',
+                'categories': categorical.categories.tolist(),
+                'ordered': bool(categorical.ordered)
+            })
+        else:
+            values = series.to_numpy()
+            columns.append({'name': name, 'kind': 'numeric'})
+
+        np.save(os.path.join(path, f'{name}.npy'), values, allow_pickle=False)
+
+    meta = {'n_rows': n_rows, 'columns': columns}
+    with open(os.path.join(path, META_FILE), 'w') as f:
+        json.dump(meta, f, indent=2, default=lambda value: value.item())
+
+
+# Build beside the final path and rename it in, so readers never see a partial store.
+# Processes that already mapped the old files keep reading them until they close.
+def write_column_store(df, path):
+    path = path.rstrip(os.sep)
+    building = f'{path}.{os.getpid()}.tmp'
+    shutil.rmtree(building, ignore_errors=True)
+    _write_columns(df, building)
+
+    if os.path.isdir(path):
+        retired = f'{path}.{os.getpid()}.old'
+        os.rename(path, retired)
+        os.rename(building, path)
+        shutil.rmtree(retired, ignore_errors=True)
+    else:
+        os.rename(building, path)
+
+
+# Columns are memory-mapped read-only; the OS page cache backs all readers
+def open_column_store(path, columns=None):
+    with open(os.path.join(path, META_FILE)) as f:
+        meta = json.load(f)
+
+    data = {}
+    for column in meta['columns']:
+        name = column['name']
+        if columns is not None and name not in columns:
+            continue
+
+        values = np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')
+        if column['kind'] == 'categorical':
+            dtype = pd.CategoricalDtype(column['categories'], ordered=column['ordered'])
+            values = pd.Categorical.from_codes(values, dtype=dtype, validate=False)
+        data[name] = values
+
+    return pd.DataFrame(data, copy=False)
+
+
+# Columnar copy of a CSV, rebuilt only when the CSV changes; categoricals are decoded
+# back to plain values so callers see the same frame pd.read_csv would have returned
+def read_csv_cached(csv_path, cache_dir):
+    stat = os.stat(csv_path)
+    key = hashlib.sha256(f'{os.path.abspath(csv_path)}|{stat.st_size}|{stat.st_mtime_ns}'.encode()).hexdigest()
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    path = os.path.join(cache_dir, f'{stem}-{key[:16]}.columns')
+
+    if not os.path.isdir(path):
+        # Concurrent builders write identical stores; the first rename wins
+        building = f'{path}.{os.getpid()}.tmp'
+        _write_columns(pd.read_csv(csv_path), building)
+        try:
+            os.rename(building, path)
+        except OSError:
+            shutil.rmtree(building, ignore_errors=True)
+
+    df = open_column_store(path)
+    for name in df.columns:
+        if isinstance(df[name].dtype, pd.CategoricalDtype):
+            df[name] = df[name].astype(df[name].cat.categories.dtype)
+    return df
@@ -3,20 +3,87 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
+import os
 import warnings
 
+from backends import get_backend
+from column_store import write_column_store
+from partitioned_store import write_partitioned
+from validation import validate_csv, validate_to_parquet
+from features import add_features
+
 warnings.filterwarnings('ignore')
 
 pd.set_option('display.max_columns', None)
 sns.set_style('whitegrid')
 
+# Execution backend: 'pandas' (in memory) or 'polars' (lazy, out-of-core)
+BACKEND = 'pandas'
+
+# Also save the cleaned data as Parquet for the lazy backends
+SAVE_PARQUET = False
+
+# Also save Year=/Region= partitioned Parquet (read by the analysis scripts' YEARS setting);
+# partitions whose rows are unchanged are not rewritten, ones no longer in the data are removed
+SAVE_PARTITIONED = False
+
+RAW_PATH = '../data/BMW_sales_data.csv'
+QUARANTINE_PATH = '../data/BMW_sales_data_quarantine.csv'
+VALIDATED_PARQUET_PATH = '../data/BMW_sales_data_validated.parquet'
+CLEANED_PATH = '../data/BMW_sales_data_cleaned.csv'
+CLEANED_PARQUET_PATH = '../data/BMW_sales_data_cleaned.parquet'
+COLUMN_STORE_PATH = '../data/BMW_sales_data_cleaned.columns'
+PARTITIONED_PATH = '../data/BMW_sales_data_partitioned'
+
+
+def print_validation(validation_report):
+    print("Validation results:")
+    print(validation_report[validation_report['Failures'] > 0].to_string(index=False))
+    if os.path.exists(QUARANTINE_PATH):
+        print(f"Quarantined rows saved to: {QUARANTINE_PATH}")
+
+
+# Validate in bounded chunks, then deduplicate and add features without materializing the data.
+# Writes the same outputs as the pandas path, so either backend can read them afterwards: the
+# CSV is streamed, the column store is collected one column at a time, partitions one year at a time.
+def clean_lazy(backend):
+    validation_report = validate_to_parquet(RAW_PATH, VALIDATED_PARQUET_PATH, QUARANTINE_PATH)
+    print_validation(validation_report)
+    
+    frame = backend.scan(VALIDATED_PARQUET_PATH)
+    frame = backend.with_features(backend.drop_duplicates(frame))
+    backend.write_parquet(frame, CLEANED_PARQUET_PATH)
+    print(f"Cleaned dataset saved to: {CLEANED_PARQUET_PATH} ({backend.name} backend)")
+    
+    cleaned = backend.scan(CLEANED_PARQUET_PATH)
+    backend.write_csv(cleaned, CLEANED_PATH)
+    print(f"Cleaned dataset saved to: {CLEANED_PATH}")
+    
+    write_column_store(((column, backend.collect(backend.scan(CLEANED_PARQUET_PATH, columns=[column]))[column])
+                        for column in backend.dtypes(cleaned).index), COLUMN_STORE_PATH)
+    print(f"Column store saved to: {COLUMN_STORE_PATH}")
+    
+    if SAVE_PARTITIONED:
+        years = sorted(backend.unique(cleaned, 'Year'))
+        partitions = write_partitioned(
+            (backend.collect(backend.scan(CLEANED_PARQUET_PATH, filters=[('Year', '==', year)])) for year in years),
+            PARTITIONED_PATH)
+        print(f"Partitioned dataset saved to: {PARTITIONED_PATH} ({len(partitions)} partitions rewritten)")
+
 
 def main():
     print("Libraries loaded\n")
     
-    # Load data
-    df = pd.read_csv('../data/BMW_sales_data.csv')
-    print(f"Original dataset shape: {df.shape}")
+    backend = get_backend(BACKEND)
+    if backend.lazy:
+        clean_lazy(backend)
+        return
+    
+    # Load data, validating each chunk and quarantining rows that break the schema
+    df, validation_report = validate_csv(RAW_PATH, QUARANTINE_PATH)
+    print_validation(validation_report)
+    
+    print(f"\nOriginal dataset shape: {df.shape}")
     print("\nFirst few rows:")
     print(df.head())
     
@@ -83,47 +150,8 @@ def main():
     plt.show()
     
     # Create enhanced features
-    df_enhanced = df.copy()
-    
     print("\nCreating new columns...\n")
-    
-    # 1. How old is the vehicle?
-    df_enhanced['Vehicle_Age'] = 2025 - df_enhanced['Year']
-    
-    # 2. Group prices into categories
-    df_enhanced['Price_Category'] = pd.cut(
-        df_enhanced['Price_USD'],
-        bins=[0, 50000, 80000, 110000, float('inf')],
-        labels=['Budget', 'Mid-Range', 'Premium', 'Luxury']
-    )
-    
-    # 3. Mileage categories
-    df_enhanced['Mileage_Category'] = pd.cut(
-        df_enhanced['Mileage_KM'],
-        bins=[0, 50000, 100000, 150000, float('inf')],
-        labels=['Low', 'Medium', 'High', 'Very High']
-    )
-    
-    # 4. Model categories (by series number)
-    df_enhanced['Model_Category'] = df_enhanced['Model'].str.extract('(\d)')[0].astype(int)
-    df_enhanced['Model_Category'] = pd.cut(
-        df_enhanced['Model_Category'],
-        bins=[0, 3, 5, 7, 10],
-        labels=['Compact', 'Mid-Size', 'Full-Size', 'Luxury']
-    )
-    
-    # 5. Age groups
-    df_enhanced['Age_Group'] = pd.cut(
-        df_enhanced['Vehicle_Age'],
-        bins=[0, 3, 7, 15],
-        labels=['New', 'Recent', 'Older']
-    )
-    
-    # 6. Sales efficiency
-    df_enhanced['Sales_per_Price'] = (df_enhanced['Sales_Volume'] / df_enhanced['Price_USD'] * 1000).round(2)
-    
-    # 7. Electric flag
-    df_enhanced['Is_Electric'] = (df_enhanced['Fuel_Type'] == 'Electric').astype(int)
+    df_enhanced = add_features(df)
     
     print(f"Created {df_enhanced.shape[1] - df.shape[1]} new features")
     
@@ -157,9 +185,21 @@ def main():
     print("\nDataset ready for analysis")
     
     # Save the enhanced dataset
-    output_path = '../data/BMW_sales_data_cleaned.csv'
+    output_path = CLEANED_PATH
     df_enhanced.to_csv(output_path, index=False)
     
+    # Memory-mapped copy that parallel analysis processes open without parsing
+    write_column_store(df_enhanced, COLUMN_STORE_PATH)
+    print(f"Column store saved to: {COLUMN_STORE_PATH}")
+    
+    if SAVE_PARQUET:
+        backend.write_parquet(df_enhanced, CLEANED_PARQUET_PATH)
+        print(f"Parquet copy saved to: {CLEANED_PARQUET_PATH}")
+    
+    if SAVE_PARTITIONED:
+        partitions = write_partitioned(df_enhanced, PARTITIONED_PATH)
+        print(f"Partitioned dataset saved to: {PARTITIONED_PATH} ({len(partitions)} partitions rewritten)")
+    
     print(f"\nCleaned dataset saved to: {output_path}")
     print(f"  Rows: {len(df_enhanced):,}")
     print(f"  Columns: {len(df_enhanced.columns)}")
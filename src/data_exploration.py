@@ -1,47 +1,65 @@
 """BMW Sales Data - Data Exploration"""
 
 import pandas as pd
-import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 import warnings
 
+from backends import get_backend
+from sketches import sketch_nunique, sketch_quantile
+from summaries import exploration_summary, zoom
+
 warnings.filterwarnings('ignore')
 
 pd.set_option('display.max_columns', None)
 sns.set_style('whitegrid')
 plt.rcParams['figure.figsize'] = (10, 5)
 
+# Use HyperLogLog / KLL sketches for distinct counts and medians
+USE_SKETCHES = False
+
+# Execution backend: 'pandas' (in memory) or 'polars' (lazy scan of the raw CSV;
+# only summaries are collected)
+BACKEND = 'pandas'
+RAW_PATH = '../data/BMW_sales_data.csv'
+
 
 def main():
     print("All libraries loaded successfully!")
     
-    # Load the data
-    df = pd.read_csv('../data/BMW_sales_data.csv')
+    # Load the data (lazy backends only scan it)
+    backend = get_backend(BACKEND)
+    frame = backend.scan(RAW_PATH)
+    n_rows, n_cols = backend.shape(frame)
     print(f"\nDataset loaded successfully!")
-    print(f"Shape: {df.shape[0]} rows and {df.shape[1]} columns")
+    print(f"Shape: {n_rows} rows and {n_cols} columns")
     
     # Display first few rows
     print("\nFirst 10 rows of the dataset:")
-    print(df.head(10))
+    print(backend.head(frame, 10))
     
     # Display last few rows
     print("\nLast 5 rows of the dataset:")
-    print(df.tail())
+    print(backend.tail(frame))
+    
+    # Check column names and their data types
+    dtypes = backend.dtypes(frame)
+    missing_counts = backend.null_counts(frame)
     
     # Get basic information about the dataset
     print("\nDataset Information:")
-    df.info()
+    if backend.lazy:
+        print(pd.DataFrame({'Non-Null Count': n_rows - missing_counts, 'Dtype': dtypes}))
+    else:
+        frame.info()
     
-    # Check column names and their data types
     print("\nColumn Names and Data Types:")
-    for col, dtype in df.dtypes.items():
+    for col, dtype in dtypes.items():
         print(f"{col:25} : {dtype}")
     
     # Check for missing values
     print("\nMissing Values Count:")
-    missing_counts = df.isnull().sum()
-    missing_percentage = (df.isnull().sum() / len(df)) * 100
+    missing_percentage = (missing_counts / n_rows) * 100
     
     missing_df = pd.DataFrame({
         'Missing Count': missing_counts,
@@ -50,40 +68,53 @@ def main():
     
     print(missing_df[missing_df['Missing Count'] > 0])
     
+    # Overview, numeric summary and per-column record counts (shared with the HTML report)
+    summary = exploration_summary(frame, backend)
+    counts = summary['counts']
+    
     # Check for duplicate rows
-    duplicates = df.duplicated().sum()
+    duplicates = summary['overview']['Duplicate rows']
     print(f"\nNumber of duplicate rows: {duplicates}")
-    print(f"Percentage of duplicates: {(duplicates/len(df))*100:.2f}%")
+    print(f"Percentage of duplicates: {(duplicates/n_rows)*100:.2f}%")
     
-    # Check unique values for categorical columns
-    categorical_cols = df.select_dtypes(include='object').columns
+    # Check unique values for categorical columns (the sketches work on in-memory frames)
+    categorical_cols = backend.string_columns(frame)
+    use_sketches = USE_SKETCHES and not backend.lazy
     
     print("\nUnique values in categorical columns:")
     for col in categorical_cols:
-        print(f"\n{col}: {df[col].nunique()} unique values")
-        print(df[col].unique())
+        if use_sketches:
+            print(f"\n{col}: ~{sketch_nunique(frame, col)} unique values")
+        else:
+            values = backend.unique(frame, col)
+            print(f"\n{col}: {pd.Series(values).nunique()} unique values")
+            print(values)
     
     # Statistical summary for numeric columns
     print("\nStatistical Summary - Numeric Columns:")
-    print(df.describe().round(2))
+    print(summary['numeric_summary'])
     
     # Statistical summary for categorical columns
     print("\nStatistical Summary - Categorical Columns:")
-    print(df.describe(include='object'))
+    print(backend.describe(frame, include='object'))
     
     # Basic statistics for numeric columns
-    numeric_cols = df.select_dtypes(include=[np.number]).columns
+    numeric_cols = backend.numeric_columns(frame)
+    numeric_stats = backend.aggregate(frame, {
+        f'{col}|{how}': (col, how) for col in numeric_cols for how in ['mean', 'median', 'min', 'max']
+    })
     
     print("\nStatistics for Numeric Columns:")
     for col in numeric_cols:
         print(f"\n{col}:")
-        print(f"  Mean: {df[col].mean():.2f}")
-        print(f"  Median: {df[col].median():.2f}")
-        print(f"  Min: {df[col].min():.2f}, Max: {df[col].max():.2f}")
+        print(f"  Mean: {numeric_stats[f'{col}|mean']:.2f}")
+        median = sketch_quantile(frame, col) if use_sketches else numeric_stats[f'{col}|median']
+        print(f"  Median: {median:.2f}")
+        print(f"  Min: {numeric_stats[f'{col}|min']:.2f}, Max: {numeric_stats[f'{col}|max']:.2f}")
     
     # Count of records by Model
     print("\nDistribution by BMW Model:")
-    model_counts = df['Model'].value_counts()
+    model_counts = counts['Model']
     print(model_counts)
     
     plt.figure(figsize=(10, 6))
@@ -94,12 +125,12 @@ def main():
     plt.xticks(rotation=45)
     plt.grid(axis='y', alpha=0.3)
     plt.tight_layout()
-    plt.ylim(4400, 4800)
+    plt.ylim(*zoom(model_counts))
     plt.show()
     
     # Distribution by Region
     print("\nDistribution by Region:")
-    region_counts = df['Region'].value_counts()
+    region_counts = counts['Region']
     print(region_counts)
     
     plt.figure(figsize=(10, 6))
@@ -109,12 +140,12 @@ def main():
     plt.ylabel('Region')
     plt.grid(axis='x', alpha=0.3)
     plt.tight_layout()
-    plt.xlim(8200, 8500)
+    plt.xlim(*zoom(region_counts))
     plt.show()
     
     # Distribution by Fuel Type
     print("\nDistribution by Fuel Type:")
-    fuel_counts = df['Fuel_Type'].value_counts()
+    fuel_counts = counts['Fuel_Type']
     print(fuel_counts)
     
     plt.figure(figsize=(8, 8))
@@ -126,7 +157,7 @@ def main():
     
     # Distribution by Transmission Type
     print("\nDistribution by Transmission:")
-    trans_counts = df['Transmission'].value_counts()
+    trans_counts = counts['Transmission']
     print(trans_counts)
     
     plt.figure(figsize=(8, 6))
@@ -137,12 +168,12 @@ def main():
     plt.xticks(rotation=0)
     plt.grid(axis='y', alpha=0.3)
     plt.tight_layout()
-    plt.ylim(24000, 26000)
+    plt.ylim(*zoom(trans_counts))
     plt.show()
     
     # Distribution by Sales Classification
     print("\nDistribution by Sales Classification:")
-    sales_class_counts = df['Sales_Classification'].value_counts()
+    sales_class_counts = counts['Sales_Classification']
     print(sales_class_counts)
     
     plt.figure(figsize=(8, 6))
@@ -158,13 +189,14 @@ def main():
     # Quick Insights
     print("\nKEY FINDINGS\n")
     
-    print(f"• Total records: {len(df):,}")
-    print(f"• Missing values: {df.isnull().sum().sum()}")
-    print(f"• BMW models: {df['Model'].nunique()}")
-    print(f"• Most common model: {df['Model'].mode()[0]}")
-    print(f"• Price range: ${df['Price_USD'].min():,.0f} - ${df['Price_USD'].max():,.0f}")
-    print(f"• Average price: ${df['Price_USD'].mean():,.0f}")
-    print(f"• Years covered: {df['Year'].min()} - {df['Year'].max()}")
+    print(f"• Total records: {n_rows:,}")
+    print(f"• Missing values: {summary['overview']['Missing values']}")
+    n_models = sketch_nunique(frame, 'Model') if use_sketches else len(model_counts)
+    print(f"• BMW models: {n_models}")
+    print(f"• Most common model: {summary['most_common_model']}")
+    print(f"• Price range: ${numeric_stats['Price_USD|min']:,.0f} - ${numeric_stats['Price_USD|max']:,.0f}")
+    print(f"• Average price: ${numeric_stats['Price_USD|mean']:,.0f}")
+    print(f"• Years covered: {summary['years'][0]} - {summary['years'][1]}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,50 @@
+"""BMW Sales Data - Feature Engineering"""
+
+import pandas as pd
+
+
+CURRENT_YEAR = 2025
+
+# Bin edges and labels for the categorical features built in add_features()
+FEATURE_BINS = {
+    'Price_Category': ([0, 50000, 80000, 110000, float('inf')],
+                       ['Budget', 'Mid-Range', 'Premium', 'Luxury']),
+    'Mileage_Category': ([0, 50000, 100000, 150000, float('inf')],
+                         ['Low', 'Medium', 'High', 'Very High']),
+    'Model_Category': ([0, 3, 5, 7, 10],
+                       ['Compact', 'Mid-Size', 'Full-Size', 'Luxury']),
+    'Age_Group': ([0, 3, 7, 15],
+                  ['New', 'Recent', 'Older'])
+}
+
+
+def add_features(df):
+    df_enhanced = df.copy()
+    
+    # 1. How old is the vehicle?
+    df_enhanced['Vehicle_Age'] = CURRENT_YEAR - df_enhanced['Year']
+    
+    # 2. Group prices into categories
+    bins, labels = FEATURE_BINS['Price_Category']
+    df_enhanced['Price_Category'] = pd.cut(df_enhanced['Price_USD'], bins=bins, labels=labels)
+    
+    # 3. Mileage categories
+    bins, labels = FEATURE_BINS['Mileage_Category']
+    df_enhanced['Mileage_Category'] = pd.cut(df_enhanced['Mileage_KM'], bins=bins, labels=labels)
+    
+    # 4. Model categories (by series number)
+    bins, labels = FEATURE_BINS['Model_Category']
+    series = df_enhanced['Model'].str.extract(r'(\d)')[0].astype(int)
+    df_enhanced['Model_Category'] = pd.cut(series, bins=bins, labels=labels)
+    
+    # 5. Age groups
+    bins, labels = FEATURE_BINS['Age_Group']
+    df_enhanced['Age_Group'] = pd.cut(df_enhanced['Vehicle_Age'], bins=bins, labels=labels)
+    
+    # 6. Sales efficiency
+    df_enhanced['Sales_per_Price'] = (df_enhanced['Sales_Volume'] / df_enhanced['Price_USD'] * 1000).round(2)
+    
+    # 7. Electric flag
+    df_enhanced['Is_Electric'] = (df_enhanced['Fuel_Type'] == 'Electric').astype(int)
+    
+    return df_enhanced
@@ -0,0 +1,45 @@
+"""BMW Sales Data - Filter Predicates"""
+
+import operator
+
+import pandas as pd
+
+
+# Filters are (column, op, value) tuples, ANDed together, e.g. [('Year', '>=', 2020)]
+COMPARISONS = {
+    '==': operator.eq, '!=': operator.ne,
+    '<': operator.lt, '<=': operator.le,
+    '>': operator.gt, '>=': operator.ge
+}
+
+
+def check_filters(filters):
+    for column, op, value in filters or []:
+        if op != 'in' and op not in COMPARISONS:
+            raise ValueError(f"Unsupported filter operator '{op}' on {column}")
+
+
+def apply_filters(frame, filters):
+    check_filters(filters)
+    mask = pd.Series(True, index=frame.index)
+    for column, op, value in filters or []:
+        if op == 'in':
+            mask &= frame[column].isin(value)
+        else:
+            mask &= COMPARISONS[op](frame[column], value)
+    return frame[mask]
+
+
+# Whether a single row of values (e.g. a partition's keys) passes the filters;
+# columns not in values are ignored
+def matches(values, filters):
+    check_filters(filters)
+    for column, op, value in filters or []:
+        if column not in values:
+            continue
+        if op == 'in':
+            if values[column] not in value:
+                return False
+        elif not COMPARISONS[op](values[column], value):
+            return False
+    return True
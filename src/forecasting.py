@@ -0,0 +1,171 @@
+"""BMW Sales Data - Sales Forecasting"""
+
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from window_metrics import build_cube, cube_to_grids
+
+
+SERIES_KEY = ('Model', 'Region', 'Fuel_Type')
+MEASURES = {'Total_Sales': 'Sales_Volume_Forecast', 'Avg_Price': 'Avg_Price_Forecast'}
+
+# Smoothing parameter grids searched per series
+ALPHAS = [0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9]
+BETAS = [0.05, 0.1, 0.2, 0.3]
+
+
+# Every forecaster takes a (series x year) array with at least one year and returns
+# (series x horizon). Trend methods fall back to a flat forecast on a single year.
+def naive_forecast(Y, horizon):
+    return np.repeat(Y[:, -1:], horizon, axis=1)
+
+
+def linear_trend_forecast(Y, horizon):
+    if Y.shape[1] < 2:
+        return naive_forecast(Y, horizon)
+    t = np.arange(Y.shape[1], dtype=float)
+    t_centered = t - t.mean()
+    slope = (Y - Y.mean(axis=1, keepdims=True)) @ t_centered / (t_centered @ t_centered)
+    intercept = Y.mean(axis=1) - slope * t.mean()
+    future = np.arange(Y.shape[1], Y.shape[1] + horizon)
+    return intercept[:, None] + slope[:, None] * future
+
+
+# alpha (and beta) may be scalars or one value per series
+def ses_forecast(Y, horizon, alpha):
+    alpha = np.asarray(alpha, dtype=float)
+    level = Y[:, 0]
+    for t in range(1, Y.shape[1]):
+        level = alpha * Y[:, t] + (1 - alpha) * level
+    return np.repeat(level[:, None], horizon, axis=1)
+
+
+def holt_forecast(Y, horizon, alpha, beta):
+    # The initial trend needs two years; with one, Holt reduces to SES
+    if Y.shape[1] < 2:
+        return ses_forecast(Y, horizon, alpha)
+    alpha = np.asarray(alpha, dtype=float)
+    beta = np.asarray(beta, dtype=float)
+    level = Y[:, 0]
+    trend = Y[:, 1] - Y[:, 0]
+    for t in range(1, Y.shape[1]):
+        previous = level
+        level = alpha * Y[:, t] + (1 - alpha) * (level + trend)
+        trend = beta * (level - previous) + (1 - beta) * trend
+    return level[:, None] + trend[:, None] * np.arange(1, horizon + 1)
+
+
+def _absolute_pct_errors(forecast, actual):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.abs(forecast - actual) / np.abs(actual) * 100
+
+
+# Worker task: per-series holdout error of one parameter combination
+def _score_params(task):
+    method, train, test, params = task
+    fitter = ses_forecast if method == 'ses' else holt_forecast
+    forecast = fitter(train, test.shape[1], *params)
+    return np.nanmean(_absolute_pct_errors(forecast, test), axis=1)
+
+
+# Pick each series' best parameters on the last `holdout` years of Y. The holdout shrinks
+# to leave at least 2 training years; with fewer than 3 years there is nothing to tune on,
+# and every series gets the middle of the grid.
+def tune(Y, method, holdout, executor=None):
+    grid = [(a,) for a in ALPHAS] if method == 'ses' else list(itertools.product(ALPHAS, BETAS))
+    holdout = min(holdout, Y.shape[1] - 2)
+    if holdout < 1:
+        return [np.full(len(Y), value) for value in grid[len(grid) // 2]]
+    train, test = Y[:, :-holdout], Y[:, -holdout:]
+    tasks = [(method, train, test, params) for params in grid]
+
+    mapper = executor.map if executor is not None else map
+    errors = np.vstack(list(mapper(_score_params, tasks)))
+
+    best = np.argmin(np.nan_to_num(errors, nan=np.inf), axis=0)
+    return [np.array([grid[b][k] for b in best]) for k in range(len(grid[0]))]
+
+
+def _forecast(method, Y, horizon, holdout, executor):
+    if method == 'naive':
+        return naive_forecast(Y, horizon)
+    if method == 'linear_trend':
+        return linear_trend_forecast(Y, horizon)
+    params = tune(Y, method, holdout, executor)
+    fitter = ses_forecast if method == 'ses' else holt_forecast
+    return fitter(Y, horizon, *params)
+
+
+METHODS = ['naive', 'linear_trend', 'ses', 'holt']
+
+
+# Fill the odd missing (series, year) cell with that series' mean over the grid's years
+def _complete(grid):
+    row_means = np.nanmean(grid, axis=1, keepdims=True)
+    return np.where(np.isnan(grid), row_means, grid)
+
+
+# Backtests each method on the last `holdout` years and forecasts with the best one. The
+# backtest holdout shrinks to leave 2 training years; with fewer than 3 years there is no
+# backtest and the naive forecast is used.
+def forecast_series(df, horizon=3, holdout=3, workers=None, methods=None, backend=None):
+    methods = METHODS if methods is None else methods
+    cube = build_cube(df, [SERIES_KEY], backend)
+    series_keys, years, grids, _ = cube_to_grids(cube, list(MEASURES))
+    if len(years) == 0:
+        raise ValueError("Forecasting needs at least one year of data")
+    holdout = min(holdout, len(years) - 2)
+
+    workers = os.cpu_count() if workers is None else workers
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+
+    report = []
+    forecasts = {}
+    try:
+        for measure in MEASURES:
+            Y = grids[measure]
+            if holdout < 1:
+                forecasts[measure] = ('naive', naive_forecast(_complete(Y), horizon))
+                continue
+
+            # Gaps in the training years are filled from the training years alone, so no
+            # held-out value leaks into the backtest; missing held-out cells are not scored
+            train, test = _complete(Y[:, :-holdout]), Y[:, -holdout:]
+
+            best_method, best_mape = None, np.inf
+            for method in methods:
+                # Backtest: tune on the training years only, score on the held-out years
+                start = time.perf_counter()
+                predicted = _forecast(method, train, holdout, holdout, executor)
+                seconds = time.perf_counter() - start
+
+                errors = predicted - test
+                mape = np.nanmean(_absolute_pct_errors(predicted, test))
+                rmse = np.sqrt(np.nanmean(errors ** 2))
+                report.append({'Measure': measure, 'Method': method, 'Holdout_Years': holdout,
+                               'MAPE': mape, 'RMSE': rmse, 'Seconds': seconds})
+
+                if mape < best_mape:
+                    best_method, best_mape = method, mape
+
+            forecasts[measure] = (best_method, _forecast(best_method, _complete(Y), horizon, holdout, executor))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    # Long output: one row per series and future year
+    keys = pd.DataFrame(series_keys, columns=list(SERIES_KEY))
+    future_years = years[-1] + np.arange(1, horizon + 1)
+    result = keys.loc[keys.index.repeat(horizon)].reset_index(drop=True)
+    result['Year'] = np.tile(future_years, len(keys))
+    for measure, column in MEASURES.items():
+        method, values = forecasts[measure]
+        result[column] = values.ravel()
+        result[f'{column}_Method'] = method
+
+    return result, pd.DataFrame(report, columns=['Measure', 'Method', 'Holdout_Years', 'MAPE', 'RMSE', 'Seconds'])
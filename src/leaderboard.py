@@ -0,0 +1,99 @@
+"""BMW Sales Data - Revenue Leaderboards"""
+
+import pandas as pd
+
+
+# Dimension combinations tracked by default; revenue is estimated as Price_USD x Sales_Volume
+LEADERBOARDS = [
+    ('Model', 'Region', 'Fuel_Type'),
+    ('Model', 'Region', 'Fuel_Type', 'Color'),
+    ('Model', 'Region', 'Fuel_Type', 'Year')
+]
+
+
+def add_revenue(df):
+    return df.assign(Revenue=df['Price_USD'].astype(float) * df['Sales_Volume'])
+
+
+class RevenueLeaderboard:
+    # capacity=None keeps every key (exact); otherwise a weighted Space-Saving summary
+    # keeps at most `capacity` counters, each overestimating revenue by at most its error
+    def __init__(self, dimensions, capacity=None):
+        self.dimensions = list(dimensions)
+        self.capacity = capacity
+        self.counts = pd.Series(dtype=float)
+        self.errors = pd.Series(dtype=float)
+
+    def _floor(self):
+        # Revenue a key missing from a full summary could still have had
+        if self.capacity is not None and len(self.counts) >= self.capacity:
+            return self.counts.min()
+        return 0.0
+
+    # Partial aggregation of one chunk, merged into the summary
+    def update(self, chunk):
+        if 'Revenue' not in chunk:
+            chunk = add_revenue(chunk)
+        partial = chunk.groupby(self.dimensions, observed=True)['Revenue'].sum()
+
+        other = RevenueLeaderboard(self.dimensions, self.capacity)
+        other.counts = partial
+        other.errors = pd.Series(0.0, index=partial.index)
+        other._trim()
+        return self.merge(other)
+
+    # Mergeable Space-Saving: a key missing from a full summary is charged that summary's floor
+    def merge(self, other):
+        if len(other.counts) == 0:
+            return self
+        if len(self.counts) == 0:
+            self.counts, self.errors = other.counts.copy(), other.errors.copy()
+            return self
+
+        self_floor, other_floor = self._floor(), other._floor()
+        keys = self.counts.index.union(other.counts.index)
+        self.counts = (self.counts.reindex(keys).fillna(self_floor)
+                       + other.counts.reindex(keys).fillna(other_floor))
+        self.errors = (self.errors.reindex(keys).fillna(self_floor)
+                       + other.errors.reindex(keys).fillna(other_floor))
+        self._trim()
+        return self
+
+    def _trim(self):
+        if self.capacity is not None and len(self.counts) > self.capacity:
+            self.counts = self.counts.nlargest(self.capacity)
+            self.errors = self.errors.reindex(self.counts.index)
+
+    def top(self, k=10):
+        top = self.counts.nlargest(k)
+        result = pd.DataFrame({
+            'Revenue': top,
+            'Error_Bound': self.errors.reindex(top.index)
+        })
+
+        # A key is certainly in the top k if its lower bound beats every other upper bound
+        rest = self.counts.drop(top.index)
+        threshold = max(rest.max() if len(rest) else 0.0, self._floor())
+        result['Guaranteed'] = result['Revenue'] - result['Error_Bound'] >= threshold
+        return result.reset_index()
+
+
+# One pass over the chunks feeds every leaderboard; results from parallel workers merge
+def build_leaderboards(chunks, combos=None, capacity=None):
+    combos = LEADERBOARDS if combos is None else combos
+    boards = {combo: RevenueLeaderboard(combo, capacity) for combo in combos}
+    for chunk in chunks:
+        if 'Revenue' not in chunk:
+            chunk = add_revenue(chunk)
+        for board in boards.values():
+            board.update(chunk)
+    return boards
+
+
+def merge_leaderboards(boards, others):
+    for combo, board in others.items():
+        if combo in boards:
+            boards[combo].merge(board)
+        else:
+            boards[combo] = board
+    return boards
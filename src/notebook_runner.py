@@ -0,0 +1,281 @@
+"""BMW Sales Data - Notebook Runner"""
+
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from column_store import read_csv_cached
+
+
+NOTEBOOK_DIR = '../notebooks'
+OUTPUT_DIR = '../data/notebook_runs'
+CACHE_DIR = '../data/.cache'
+
+# Parameters injected into every notebook
+INPUT_PATH = '../data/BMW_sales_data.csv'
+SAMPLE_FRAC = 1.0
+YEAR_RANGE = None  # e.g. (2015, 2024), inclusive
+SEED = 42
+
+# Notebooks in the same stage run in parallel kernels; later stages read what earlier ones wrote
+STAGES = [
+    ['data_cleaning.ipynb', 'data_exploration.ipynb'],
+    ['analysis.ipynb', 'visualization.ipynb']
+]
+
+# Data paths hard-coded in the notebooks, mapped to the injected parameter names
+DATA_PATHS = {
+    "'../data/BMW_sales_data.csv'": 'INPUT_PATH',
+    "'../data/BMW_sales_data_cleaned.csv'": 'CLEANED_PATH'
+}
+
+PARAMETERS_CELL = '''# Parameters (injected by notebook_runner)
+import sys
+sys.path.insert(0, {src_dir!r})
+from column_store import read_csv_cached
+
+INPUT_PATH = {input_path!r}
+CLEANED_PATH = {cleaned_path!r}
+CACHE_DIR = {cache_dir!r}
+SAMPLE_FRAC = {sample_frac!r}
+YEAR_RANGE = {year_range!r}
+SEED = {seed!r}
+
+# Every notebook shares one cached columnar copy of each CSV instead of re-parsing it
+def load_dataset(path):
+    df = read_csv_cached(path, CACHE_DIR)
+    if path == INPUT_PATH and (YEAR_RANGE is not None or SAMPLE_FRAC < 1):
+        if YEAR_RANGE is not None:
+            df = df[df['Year'].between(*YEAR_RANGE)]
+        if SAMPLE_FRAC < 1:
+            df = df.sample(frac=SAMPLE_FRAC, random_state=SEED).sort_index()
+        df = df.reset_index(drop=True)
+    return df
+'''
+
+
+def _jupyter():
+    try:
+        import nbformat
+        from nbclient import NotebookClient
+    except ImportError:
+        raise ImportError("The notebook runner needs nbclient: pip install nbclient nbformat ipykernel")
+    return nbformat, NotebookClient
+
+
+def _rewrite(source):
+    for literal, name in DATA_PATHS.items():
+        source = source.replace(f'pd.read_csv({literal})', f'load_dataset({name})')
+        source = source.replace(literal, name)
+    return source
+
+
+# Data paths a notebook reads, and paths it writes (referenced outside load_dataset).
+# The injected parameters cell names every path, so it is not counted.
+def _data_dependencies(nb):
+    reads, writes = set(), set()
+    for cell in nb.cells:
+        if cell.cell_type != 'code' or 'injected-parameters' in cell.metadata.get('tags', []):
+            continue
+        for name in DATA_PATHS.values():
+            rest = cell.source.replace(f'load_dataset({name})', '')
+            if rest != cell.source:
+                reads.add(name)
+            if name in rest:
+                writes.add(name)
+    return reads, writes
+
+
+def _hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# Content hash of a data file, remembered by (size, mtime) so unchanged files are not re-read
+def file_fingerprint(path, cache_dir=CACHE_DIR):
+    index_path = os.path.join(cache_dir, 'fingerprints.json')
+    index = {}
+    if os.path.exists(index_path):
+        with open(index_path) as f:
+            index = json.load(f)
+
+    stat = os.stat(path)
+    entry_key = f'{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}'
+    if entry_key not in index:
+        index[entry_key] = _hash_file(path)
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(index_path, 'w') as f:
+            json.dump(index, f, indent=2)
+    return index[entry_key]
+
+
+# A cell's key covers its own code, every code cell above it (which built the kernel
+# state it runs in), the injected parameters and the input data, in one running hash
+def _cell_keys(nb, data_hash):
+    digest = hashlib.sha256(data_hash.encode())
+    keys = []
+    for cell in nb.cells:
+        if cell.cell_type != 'code':
+            keys.append(None)
+            continue
+        digest.update(cell.source.encode())
+        digest.update(b'\0')
+        keys.append(digest.hexdigest())
+    return keys
+
+
+def _cell_cache_path(cache_dir, key):
+    return os.path.join(cache_dir, 'cells', key[:2], f'{key}.json')
+
+
+# Content hashes of the files a cached run wrote, stored under the notebook's last cell key
+def _writes_path(cache_dir, key):
+    return os.path.join(cache_dir, 'writes', key[:2], f'{key}.json')
+
+
+# Whether every file the notebook writes still holds what the cached run wrote. Output
+# paths are shared across parameter sets, so another run may have replaced them since.
+def _outputs_current(cache_dir, key, writes, params):
+    path = _writes_path(cache_dir, key)
+    if not os.path.exists(path):
+        return not writes
+    with open(path) as f:
+        recorded = json.load(f)
+    for name in writes:
+        output = params[name.lower()]
+        if not os.path.exists(output) or recorded.get(name) != _hash_file(output):
+            return False
+    return True
+
+
+def prepare_notebook(name, params, notebook_dir=NOTEBOOK_DIR):
+    nbformat, _ = _jupyter()
+    nb = nbformat.read(os.path.join(notebook_dir, name), as_version=4)
+    for cell in nb.cells:
+        if cell.cell_type == 'code':
+            cell.source = _rewrite(cell.source)
+
+    parameters = nbformat.v4.new_code_cell(PARAMETERS_CELL.format(**params))
+    parameters.metadata['tags'] = ['injected-parameters']
+    nb.cells.insert(0, parameters)
+    return nb
+
+
+# Worker task: run one notebook in its own kernel unless every cell is already cached
+def run_notebook(task):
+    name, params, data_hashes, output_dir, cache_dir, timeout = task
+    nbformat, NotebookClient = _jupyter()
+    start = time.perf_counter()
+
+    nb = prepare_notebook(name, params)
+    reads, writes = _data_dependencies(nb)
+    data_hash = '|'.join(f'{path}={data_hashes[path]}' for path in sorted(reads))
+    keys = _cell_keys(nb, data_hash)
+
+    cached = {}
+    for key in filter(None, keys):
+        path = _cell_cache_path(cache_dir, key)
+        if os.path.exists(path):
+            with open(path) as f:
+                cached[key] = json.load(f)
+
+    # Keys chain, so hits are always a leading run of cells. Kernel state cannot be
+    # restored from outputs, so any miss re-runs the notebook from its first cell;
+    # a full hit (with the files it writes unchanged since that run) skips the kernel entirely.
+    code_cells = [key for key in keys if key is not None]
+    executed = not (all(key in cached for key in code_cells)
+                    and _outputs_current(cache_dir, code_cells[-1], writes, params))
+
+    output_path = os.path.join(output_dir, name)
+    try:
+        if executed:
+            client = NotebookClient(nb, timeout=timeout, kernel_name='python3',
+                                    resources={'metadata': {'path': os.path.abspath(NOTEBOOK_DIR)}})
+            client.execute()
+        else:
+            for cell, key in zip(nb.cells, keys):
+                if key is not None:
+                    cell.outputs = [nbformat.from_dict(output) for output in cached[key]['outputs']]
+                    cell.execution_count = cached[key]['execution_count']
+    finally:
+        nbformat.write(nb, output_path)
+
+    if executed:
+        for cell, key in zip(nb.cells, keys):
+            if key is not None and key not in cached:
+                path = _cell_cache_path(cache_dir, key)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'w') as f:
+                    json.dump({'outputs': cell.outputs, 'execution_count': cell.execution_count}, f)
+
+        path = _writes_path(cache_dir, code_cells[-1])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump({name: _hash_file(params[name.lower()]) for name in writes}, f)
+
+    return {
+        'Notebook': name,
+        'Code_Cells': len(code_cells),
+        'Cached_Cells': sum(key in cached for key in code_cells),
+        'Executed': executed,
+        'Seconds': round(time.perf_counter() - start, 2)
+    }
+
+
+def run_notebooks(input_path=INPUT_PATH, sample_frac=SAMPLE_FRAC, year_range=YEAR_RANGE, seed=SEED,
+                  stages=None, output_dir=OUTPUT_DIR, cache_dir=CACHE_DIR, workers=None, timeout=600):
+    stages = STAGES if stages is None else stages
+    os.makedirs(output_dir, exist_ok=True)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    # Absolute paths, since the kernels run from the notebook directory
+    params = {
+        'src_dir': os.path.abspath(os.path.dirname(__file__)),
+        'input_path': os.path.abspath(input_path),
+        'cleaned_path': os.path.abspath(os.path.join(output_dir, 'BMW_sales_data_cleaned.csv')),
+        'cache_dir': os.path.abspath(cache_dir),
+        'sample_frac': sample_frac,
+        'year_range': tuple(year_range) if year_range is not None else None,
+        'seed': seed
+    }
+    paths = {'INPUT_PATH': params['input_path'], 'CLEANED_PATH': params['cleaned_path']}
+
+    report = []
+    workers = os.cpu_count() if workers is None else workers
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for stage in stages:
+            # Hash inputs and build their columnar copies once, before the kernels race for them
+            data_hashes = {}
+            for name, path in paths.items():
+                if os.path.exists(path):
+                    data_hashes[name] = file_fingerprint(path, cache_dir)
+                    read_csv_cached(path, cache_dir)
+
+            tasks = [(name, params, data_hashes, output_dir, cache_dir, timeout) for name in stage]
+            report.extend(executor.map(run_notebook, tasks))
+
+    return pd.DataFrame(report)
+
+
+def main():
+    print("Running notebooks...")
+    print(f"  Input: {INPUT_PATH}")
+    print(f"  Sample fraction: {SAMPLE_FRAC}")
+    print(f"  Year range: {YEAR_RANGE if YEAR_RANGE is not None else 'all'}")
+
+    report = run_notebooks()
+
+    print("\nRun summary:")
+    print(report.to_string(index=False))
+    print(f"\nExecuted notebooks saved to: {OUTPUT_DIR}")
+
+
+if __name__ == "__main__":
+    main()
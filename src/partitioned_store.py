@@ -0,0 +1,184 @@
+"""BMW Sales Data - Partitioned Parquet Store"""
+
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from urllib.parse import quote, unquote
+
+import pandas as pd
+
+from filters import apply_filters, matches
+
+
+# Hive-style layout: <root>/Year=2020/Region=Asia/part-*.parquet
+PARTITION_COLUMNS = ['Year', 'Region']
+
+# Content hash of the rows last written by an overwrite, kept beside the partition's files
+DIGEST_FILE = '_digest'
+
+# Column order of the written frame, kept at the root; readers restore it, since the
+# partition columns live in the directory names rather than in the files
+COLUMNS_FILE = '_columns'
+
+
+def _partition_dir(root, partition_cols, key):
+    key = key if isinstance(key, tuple) else (key,)
+    parts = [f"{col}={quote(str(value), safe='')}" for col, value in zip(partition_cols, key)]
+    return os.path.join(root, *parts)
+
+
+def _digest(frame):
+    digest = hashlib.sha256(repr(list(frame.dtypes.items())).encode())
+    digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _read_digest(directory):
+    path = os.path.join(directory, DIGEST_FILE)
+    if not os.path.exists(os.path.join(directory, 'part-0.parquet')) or not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return f.read().strip()
+
+
+def _parse_value(text):
+    value = unquote(text)
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+
+def stored_columns(root):
+    path = os.path.join(root, COLUMNS_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+# Remove a partition directory, then any parents (below root) it leaves empty
+def _remove_partition(root, directory):
+    shutil.rmtree(directory)
+    parent = os.path.dirname(directory)
+    while os.path.normpath(parent) != os.path.normpath(root) and not os.listdir(parent):
+        os.rmdir(parent)
+        parent = os.path.dirname(parent)
+
+
+# mode='overwrite' makes the dataset hold exactly df: partitions whose rows changed since the
+# last write are rewritten, unchanged ones are skipped and partitions not present in df are
+# deleted. mode='update' rewrites changed partitions of df the same way but leaves every other
+# partition in place, so new years can be added cheaply; 'append' adds a new file to each
+# partition of df. df may also be an iterable of frames (e.g. one year each, collected
+# from a lazy backend), as long as no partition's rows span two of them.
+# Returns the directories actually written.
+def write_partitioned(df, root, partition_cols=None, mode='overwrite'):
+    if mode not in ('overwrite', 'update', 'append'):
+        raise ValueError(f"Unknown write mode '{mode}'. Use 'overwrite', 'update' or 'append'")
+    partition_cols = PARTITION_COLUMNS if partition_cols is None else list(partition_cols)
+    frames = [df] if isinstance(df, pd.DataFrame) else df
+
+    stored = stored_columns(root)
+    columns, written, kept = None, [], set()
+    for frame in frames:
+        if columns is None:
+            columns = list(frame.columns)
+            if mode != 'overwrite' and stored is not None and sorted(stored) != sorted(columns):
+                raise ValueError(f"Columns of df do not match the dataset at {root}: {stored}")
+        written.extend(_write_groups(frame, root, partition_cols, mode, kept))
+
+    if mode == 'overwrite':
+        for _, directory in list_partitions(root):
+            if os.path.normpath(directory) not in kept:
+                _remove_partition(root, directory)
+
+    if columns is not None:
+        os.makedirs(root, exist_ok=True)
+        with open(os.path.join(root, COLUMNS_FILE), 'w') as f:
+            json.dump(columns, f)
+    return written
+
+
+# Write each partition of one frame; kept collects every partition directory seen
+def _write_groups(df, root, partition_cols, mode, kept):
+    written = []
+    for key, group in df.groupby(partition_cols, observed=True, sort=True):
+        directory = _partition_dir(root, partition_cols, key)
+        rows = group.drop(columns=partition_cols)
+        kept.add(os.path.normpath(directory))
+
+        if mode != 'append':
+            digest = _digest(rows)
+            if _read_digest(directory) == digest:
+                continue
+            if os.path.isdir(directory):
+                shutil.rmtree(directory)
+        os.makedirs(directory, exist_ok=True)
+
+        filename = f'part-{uuid.uuid4().hex}.parquet' if mode == 'append' else 'part-0.parquet'
+        rows.to_parquet(os.path.join(directory, filename), index=False)
+
+        # An appended file makes the stored digest stale
+        digest_path = os.path.join(directory, DIGEST_FILE)
+        if mode != 'append':
+            with open(digest_path, 'w') as f:
+                f.write(digest)
+        elif os.path.exists(digest_path):
+            os.remove(digest_path)
+        written.append(directory)
+    return written
+
+
+# Every leaf partition as ({column: value}, directory)
+def list_partitions(root):
+    partitions = []
+    for directory, subdirs, files in os.walk(root):
+        if subdirs or not any(f.endswith('.parquet') for f in files):
+            continue
+        relative = os.path.relpath(directory, root)
+        values = {}
+        for part in relative.split(os.sep):
+            column, _, text = part.partition('=')
+            values[column] = _parse_value(text)
+        partitions.append((values, directory))
+    return sorted(partitions, key=lambda item: item[1])
+
+
+# Filters use the filters.py format, e.g. [('Year', 'in', [2023, 2024]), ('Region', '==', 'Asia')]
+def prune_partitions(partitions, filters):
+    return [(values, directory) for values, directory in partitions
+            if matches(values, filters)]
+
+
+def read_partitioned(root, columns=None, filters=None):
+    partitions = list_partitions(root)
+    kept = prune_partitions(partitions, filters)
+    partition_cols = list(partitions[0][0]) if partitions else []
+
+    file_columns = None
+    if columns is not None:
+        file_columns = [col for col in columns if col not in partition_cols]
+
+    frames = []
+    for values, directory in kept:
+        files = sorted(f for f in os.listdir(directory) if f.endswith('.parquet'))
+        for filename in files:
+            frame = pd.read_parquet(os.path.join(directory, filename), columns=file_columns)
+            for column, value in values.items():
+                frame[column] = value
+            frames.append(frame)
+
+    if columns is None:
+        columns = stored_columns(root)
+    if not frames:
+        return pd.DataFrame(columns=columns)
+
+    df = pd.concat(frames, ignore_index=True)
+
+    # Filters on non-partition columns still apply row by row
+    row_filters = [f for f in filters or [] if f[0] not in partition_cols]
+    df = apply_filters(df, row_filters)
+    return df if columns is None else df[columns]
@@ -0,0 +1,508 @@
+"""BMW Sales Data - HTML Report Builder"""
+
+import base64
+import hashlib
+import html
+import inspect
+import io
+import os
+import sys
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import pandas as pd
+import seaborn as sns
+
+import summaries
+from column_store import open_column_store
+from summaries import COUNT_COLS, plot_histogram, zoom
+
+sns.set_style('whitegrid')
+
+RAW_PATH = '../data/BMW_sales_data.csv'
+CLEANED_PATH = '../data/BMW_sales_data_cleaned.csv'
+COLUMN_STORE_PATH = '../data/BMW_sales_data_cleaned.columns'
+REPORT_PATH = '../reports/BMW_sales_report.html'
+CACHE_DIR = '../data/.cache'
+
+# Every section is split in two: inputs() reduces the data to small aggregates (the same
+# summaries the analysis scripts print), which are hashed into the fragment's cache key;
+# render() draws tables, findings and charts from those aggregates alone, so an unchanged
+# key always renders the same fragment.
+
+# Data exploration sections (raw data)
+
+def _exploration_inputs(raw):
+    return summaries.exploration_summary(raw)
+
+
+def _exploration_render(inputs):
+    overview, summary, counts = inputs['overview'], inputs['numeric_summary'], inputs['counts']
+    price = summary['Price_USD']
+    findings = [
+        f"Total records: {overview['Records']:,}",
+        f"Missing values: {overview['Missing values']}",
+        f"BMW models: {len(counts['Model'])}",
+        f"Most common model: {inputs['most_common_model']}",
+        f"Price range: ${price['min']:,.0f} - ${price['max']:,.0f}",
+        f"Average price: ${price['mean']:,.0f}",
+        f"Years covered: {inputs['years'][0]} - {inputs['years'][1]}"
+    ]
+    tables = [('Dataset overview', overview.to_frame()),
+              ('Statistical summary - numeric columns', summary)]
+    tables += [(f'Records by {col}', counts[col].to_frame('Records')) for col in COUNT_COLS]
+
+    charts = []
+    fig, ax = plt.subplots(figsize=(10, 6))
+    counts['Model'].plot(kind='bar', color='steelblue', edgecolor='black', ax=ax)
+    ax.set_title('Number of Sales Records by BMW Model', fontsize=14, fontweight='bold')
+    ax.set_ylabel('Count')
+    ax.tick_params(axis='x', rotation=45)
+    ax.set_ylim(*zoom(counts['Model']))
+    charts.append(('Records by model', fig))
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    counts['Region'].plot(kind='barh', color='coral', edgecolor='black', ax=ax)
+    ax.set_title('Number of Sales Records by Region', fontsize=14, fontweight='bold')
+    ax.set_xlabel('Count')
+    ax.set_xlim(*zoom(counts['Region']))
+    charts.append(('Records by region', fig))
+
+    fig, axes = plt.subplots(1, 3, figsize=(18, 6))
+    axes[0].pie(counts['Fuel_Type'], labels=counts['Fuel_Type'].index, autopct='%1.1f%%',
+                startangle=90, colors=sns.color_palette('Set2'))
+    axes[0].set_title('Distribution of Fuel Types', fontsize=12, fontweight='bold')
+    counts['Transmission'].plot(kind='bar', color=['#2ecc71', '#e74c3c'], edgecolor='black', ax=axes[1])
+    axes[1].set_title('Distribution of Transmission Types', fontsize=12, fontweight='bold')
+    axes[1].tick_params(axis='x', rotation=0)
+    counts['Sales_Classification'].plot(kind='bar', color=['#3498db', '#e67e22'], edgecolor='black', ax=axes[2])
+    axes[2].set_title('Distribution of Sales Classification', fontsize=12, fontweight='bold')
+    axes[2].tick_params(axis='x', rotation=0)
+    charts.append(('Fuel type, transmission and sales classification', fig))
+
+    return findings, tables, charts
+
+
+# Statistical analysis sections (cleaned data)
+
+def _correlation_inputs(df):
+    return {'correlation': summaries.correlation(df).round(4)}
+
+
+def _correlation_render(inputs):
+    correlation = inputs['correlation']
+    fig, ax = plt.subplots(figsize=(8, 6))
+    sns.heatmap(correlation, annot=True, fmt='.2f', cmap='coolwarm', center=0, ax=ax)
+    ax.set_title('How Variables Relate to Each Other', fontsize=12)
+    findings = ['1.0 = perfect positive relationship, -1.0 = perfect negative relationship']
+    return findings, [('Correlation matrix', correlation.round(2))], [('Correlation heatmap', fig)]
+
+
+def _price_inputs(df):
+    return summaries.price_summary(df)
+
+
+def _price_render(inputs):
+    tables = [('Price by model', inputs['by_model']),
+              ('Price by region', inputs['by_region']),
+              ('Price by fuel type', inputs['by_fuel'])]
+
+    fig, axes = plt.subplots(1, 2, figsize=(16, 6))
+    by_region, by_fuel = inputs['by_region']['mean'], inputs['by_fuel']['mean']
+    by_region.plot(kind='barh', color='teal', edgecolor='black', ax=axes[0])
+    axes[0].set_title('Average Price by Region', fontsize=12, fontweight='bold')
+    axes[0].set_xlabel('Average Price (USD)')
+    axes[0].set_xlim(*zoom(by_region))
+    by_fuel.plot(kind='bar', color=['#e74c3c', '#3498db', '#2ecc71', '#f39c12'], edgecolor='black', ax=axes[1])
+    axes[1].set_title('Average Price by Fuel Type', fontsize=12, fontweight='bold')
+    axes[1].set_ylabel('Average Price (USD)')
+    axes[1].tick_params(axis='x', rotation=0)
+    axes[1].set_ylim(*zoom(by_fuel))
+    return [], tables, [('Average price by region and fuel type', fig)]
+
+
+def _sales_inputs(df):
+    return summaries.sales_summary(df)
+
+
+def _sales_render(inputs):
+    by_model, by_region = inputs['by_model'], inputs['by_region']
+    tables = [('Sales volume by model', by_model), ('Sales volume by region', by_region)]
+
+    fig, axes = plt.subplots(1, 3, figsize=(20, 6))
+    by_model['Total_Sales'].plot(kind='bar', color='steelblue', edgecolor='black', ax=axes[0])
+    axes[0].set_title('Total Sales Volume by Model', fontsize=12, fontweight='bold')
+    axes[0].tick_params(axis='x', rotation=45)
+    axes[0].set_ylim(*zoom(by_model['Total_Sales']))
+    by_model['Avg_Sales'].plot(kind='bar', color='coral', edgecolor='black', ax=axes[1])
+    axes[1].set_title('Average Sales Volume by Model', fontsize=12, fontweight='bold')
+    axes[1].tick_params(axis='x', rotation=45)
+    axes[1].set_ylim(*zoom(by_model['Avg_Sales']))
+    by_region['Total_Sales'].plot(kind='barh', color='mediumseagreen', edgecolor='black', ax=axes[2])
+    axes[2].set_title('Total Sales Volume by Region', fontsize=12, fontweight='bold')
+    axes[2].set_xlim(*zoom(by_region['Total_Sales']))
+    return [], tables, [('Sales volume by model and region', fig)]
+
+
+def _hypothesis_inputs(df):
+    hypotheses = summaries.hypothesis_tests(df)
+    return {'tests': hypotheses['tests'].round(4), 'contingency': hypotheses['contingency']}
+
+
+def _hypothesis_render(inputs):
+    tests = inputs['tests']
+    findings = [f"{row.Hypothesis}: p = {row.P_Value:.4f} "
+                f"({'significant' if row.Significant else 'no significant difference'})"
+                for row in tests.itertuples()]
+    tables = [('Hypothesis tests', tests.set_index('Hypothesis')),
+              ('Sales classification vs region', inputs['contingency'])]
+    return findings, tables, []
+
+
+def _temporal_inputs(df):
+    return summaries.temporal_summary(df)
+
+
+def _temporal_render(inputs):
+    yearly = inputs['yearly']
+    fig, axes = plt.subplots(2, 1, figsize=(14, 10))
+    axes[0].plot(yearly.index, yearly['Sales_Volume'], marker='o', linewidth=2, markersize=8, color='steelblue')
+    axes[0].set_title('Total Sales Volume by Year', fontsize=12, fontweight='bold')
+    axes[0].set_ylabel('Total Sales Volume')
+    axes[1].plot(yearly.index, yearly['Price_USD'], marker='s', linewidth=2, markersize=8, color='coral')
+    axes[1].set_title('Average Price by Year', fontsize=12, fontweight='bold')
+    axes[1].set_ylabel('Average Price (USD)')
+    tables = [('Yearly trends', yearly),
+              ('Fastest-growing series in the latest year', inputs['movers'].set_index('Dimension'))]
+    return [], tables, [('Sales and price over time', fig)]
+
+
+def _category_inputs(df):
+    return {'categories': summaries.category_summary(df)}
+
+
+def _category_render(inputs):
+    categories = inputs['categories']
+    fig, axes = plt.subplots(1, 2, figsize=(16, 6))
+    categories['Sales_Volume'].plot(kind='bar', color='teal', edgecolor='black', ax=axes[0])
+    axes[0].set_title('Total Sales by Model Category', fontsize=12, fontweight='bold')
+    axes[0].tick_params(axis='x', rotation=45)
+    categories['Price_USD'].plot(kind='bar', color='orange', edgecolor='black', ax=axes[1])
+    axes[1].set_title('Average Price by Model Category', fontsize=12, fontweight='bold')
+    axes[1].tick_params(axis='x', rotation=45)
+    axes[1].set_ylim(*zoom(categories['Price_USD']))
+    return [], [('Sales and price by model category', categories)], [('Model categories', fig)]
+
+
+def _statistical_findings_inputs(df):
+    return summaries.key_findings(df, summaries.price_summary(df), summaries.sales_summary(df))
+
+
+def _statistical_findings_render(inputs):
+    findings = [
+        f"Average price: ${inputs['avg_price']:,.0f}",
+        f"Most expensive model: {inputs['most_expensive'][0]} (${inputs['most_expensive'][1]:,.0f})",
+        f"Best seller: {inputs['best_seller'][0]} ({inputs['best_seller'][1]:,.0f} units)",
+        f"Top region: {inputs['top_region']}",
+        f"Popular fuel: {inputs['popular_fuel'][0]} ({inputs['popular_fuel'][1]} records)",
+        f"Popular transmission: {inputs['popular_transmission']}"
+    ]
+    return findings, [], []
+
+
+# Visualization sections (cleaned data)
+
+def _distribution_inputs(df):
+    return summaries.distribution_summary(df)
+
+
+def _distribution_render(inputs):
+    means = inputs['means']
+    fig, axes = plt.subplots(1, 2, figsize=(16, 6))
+    for ax, key, column, color, label in [(axes[0], 'price', 'Price_USD', 'skyblue', 'Price (USD)'),
+                                          (axes[1], 'sales', 'Sales_Volume', 'lightcoral', 'Sales Volume')]:
+        plot_histogram(ax, inputs[key], color=color)
+        ax.axvline(means[column], color='red', linestyle='--', label=f'Avg: {means[column]:,.0f}')
+        ax.set_title(f'{label.split(" (")[0]} Distribution', fontsize=12)
+        ax.set_xlabel(label)
+        ax.set_ylabel('Count')
+        ax.set_ylim(*zoom(inputs[key]['Count']))
+        ax.legend()
+    findings = [f"Avg Price: ${means['Price_USD']:,.0f} | Avg Sales: {means['Sales_Volume']:,.0f}"]
+    return findings, [], [('Price and sales volume distributions', fig)]
+
+
+def _heatmap_inputs(df):
+    return {'heatmap': summaries.model_region_heatmap(df).round(2)}
+
+
+def _heatmap_render(inputs):
+    fig, ax = plt.subplots(figsize=(10, 6))
+    sns.heatmap(inputs['heatmap'], annot=True, fmt='.0f', cmap='YlOrRd',
+                cbar_kws={'label': 'Avg Sales Volume'}, ax=ax)
+    ax.set_title('Average Sales Volume by Model and Region', fontsize=12)
+    findings = ['This shows which models perform best in each region.']
+    return findings, [], [('Average sales volume by model and region', fig)]
+
+
+def _fuel_trend_inputs(df):
+    return summaries.popularity_trends(df)
+
+
+def _fuel_trend_render(inputs):
+    fuel_yearly = inputs['fuel_yearly'].pivot(index='Year', columns='Fuel_Type', values='Count')
+    model_yearly = inputs['model_yearly'].pivot(index='Year', columns='Model', values='Count')
+    fig, axes = plt.subplots(1, 2, figsize=(16, 6))
+    fuel_yearly.plot(marker='o', ax=axes[0])
+    axes[0].set_title('Fuel Type Popularity Over Time', fontsize=12, fontweight='bold')
+    axes[0].set_ylabel('Number of Records')
+    model_yearly.plot(marker='o', ax=axes[1])
+    axes[1].set_title('Popularity of Top 3 Models Over Time', fontsize=12, fontweight='bold')
+    axes[1].set_ylabel('Number of Records')
+    return [], [('Records by year and fuel type', fuel_yearly)], [('Popularity over time', fig)]
+
+
+def _regional_inputs(df):
+    return {'regions': summaries.regional_summary(df).round(2)}
+
+
+def _regional_render(inputs):
+    regions = inputs['regions']
+    fig, axes = plt.subplots(1, 3, figsize=(20, 6))
+    for ax, column, color, title in [(axes[0], 'Total_Sales', 'steelblue', 'Total Sales by Region'),
+                                     (axes[1], 'Avg_Price', 'coral', 'Average Price by Region'),
+                                     (axes[2], 'Number_of_Records', 'lightgreen', 'Market Presence by Region')]:
+        ax.barh(regions.index.astype(str), regions[column], color=color)
+        ax.set_title(title, fontsize=12)
+        ax.set_xlim(*zoom(regions[column]))
+    return [], [('Regional comparison', regions)], [('Regional comparison', fig)]
+
+
+def _high_low_inputs(df):
+    return summaries.high_low_summary(df)
+
+
+def _high_low_render(inputs):
+    fig, axes = plt.subplots(1, 2, figsize=(16, 6))
+    for ax, column, title in [(axes[0], 'Price_USD', 'Price: High vs Low Sales'),
+                              (axes[1], 'Sales_Volume', 'Volume: High vs Low Sales')]:
+        plot_histogram(ax, inputs[column], 'High', color='green', alpha=0.6, label='High Sales')
+        plot_histogram(ax, inputs[column], 'Low', color='red', alpha=0.6, label='Low Sales')
+        ax.set_title(title, fontsize=12)
+        ax.legend()
+    avg_price = inputs['avg_price']
+    findings = [f"{label} Sales Avg Price: ${avg_price[label]:,.0f}" for label in avg_price.index]
+    return findings, [], [('High vs low sales performance', fig)]
+
+
+def _executive_inputs(df):
+    dashboard = summaries.sales_dashboard(df)
+    return {
+        'top_models': dashboard['model_sales'].head(5),
+        'region_sales': dashboard['region_sales'],
+        'records': dashboard['records'],
+        'years': dashboard['years'],
+        'total_sales': dashboard['total_sales']
+    }
+
+
+def _executive_render(inputs):
+    top_models, region_sales = inputs['top_models'], inputs['region_sales']
+    fig, axes = plt.subplots(1, 2, figsize=(16, 6))
+    axes[0].barh(top_models.index.astype(str), top_models.values, color='steelblue')
+    axes[0].set_title('Top 5 Best Selling Models', fontsize=12, fontweight='bold')
+    axes[0].set_xlim(*zoom(top_models))
+    colors = ['#3498db', '#e74c3c', '#2ecc71', '#f39c12', '#9b59b6', '#1abc9c']
+    axes[1].pie(region_sales, labels=region_sales.index, autopct='%1.1f%%', startangle=90,
+                colors=colors[:len(region_sales)])
+    axes[1].set_title('Sales Distribution by Region', fontsize=12, fontweight='bold')
+    findings = [
+        f"Dataset: {inputs['records']:,} records analyzed",
+        f"Time period: {inputs['years'][0]}-{inputs['years'][1]}",
+        f"Total sales volume: {inputs['total_sales']:,.0f}"
+    ]
+    tables = [('Top 5 models by sales volume', top_models.to_frame('Total_Sales'))]
+    return findings, tables, [('Executive summary', fig)]
+
+
+# Report layout: (group, section id, title, data source, inputs, render)
+SECTIONS = [
+    ('Data Exploration', 'exploration', 'Dataset Overview', 'raw', _exploration_inputs, _exploration_render),
+    ('Statistical Analysis', 'key_findings', 'Key Findings', 'cleaned',
+     _statistical_findings_inputs, _statistical_findings_render),
+    ('Statistical Analysis', 'correlation', 'Correlation Analysis', 'cleaned', _correlation_inputs, _correlation_render),
+    ('Statistical Analysis', 'price', 'Price Analysis', 'cleaned', _price_inputs, _price_render),
+    ('Statistical Analysis', 'sales_volume', 'Sales Volume Analysis', 'cleaned', _sales_inputs, _sales_render),
+    ('Statistical Analysis', 'hypothesis_tests', 'Hypothesis Testing', 'cleaned',
+     _hypothesis_inputs, _hypothesis_render),
+    ('Statistical Analysis', 'temporal', 'Temporal Analysis', 'cleaned', _temporal_inputs, _temporal_render),
+    ('Statistical Analysis', 'model_category', 'Model Category Analysis', 'cleaned',
+     _category_inputs, _category_render),
+    ('Visualizations', 'distributions', 'Price and Sales Distributions', 'cleaned',
+     _distribution_inputs, _distribution_render),
+    ('Visualizations', 'heatmap', 'Model x Region Heatmap', 'cleaned', _heatmap_inputs, _heatmap_render),
+    ('Visualizations', 'trends', 'Popularity Over Time', 'cleaned', _fuel_trend_inputs, _fuel_trend_render),
+    ('Visualizations', 'regional', 'Regional Comparison', 'cleaned', _regional_inputs, _regional_render),
+    ('Visualizations', 'high_vs_low', 'High vs Low Sales Comparison', 'cleaned', _high_low_inputs, _high_low_render),
+    ('Visualizations', 'executive', 'Executive Summary', 'cleaned', _executive_inputs, _executive_render)
+]
+
+
+# Stable hash of nested aggregates (frames, series, dicts, tuples and scalars)
+def _fingerprint(value, digest):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        labels = list(value.columns) if isinstance(value, pd.DataFrame) else [value.name]
+        digest.update(repr((type(value).__name__, value.shape, labels, value.index.names)).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, dict):
+        for key in sorted(value):
+            digest.update(repr(key).encode())
+            _fingerprint(value[key], digest)
+    elif isinstance(value, (list, tuple)):
+        digest.update(f'{type(value).__name__}{len(value)}'.encode())
+        for item in value:
+            _fingerprint(item, digest)
+    else:
+        digest.update(repr(value).encode())
+
+
+# The key covers everything written into the fragment: its title, the aggregates and the
+# rendering code. Renders call helpers (zoom, plot_histogram, _figure_html, ...), so the
+# whole source of this module, the shared summaries and the render's own module is hashed
+# rather than the render function alone; editing any of them invalidates the fragment.
+def fragment_key(section_id, title, inputs, render):
+    digest = hashlib.sha256(section_id.encode())
+    digest.update(b'\0')
+    digest.update(title.encode())
+    modules = {sys.modules[__name__], summaries, inspect.getmodule(render)}
+    for module in sorted(modules, key=lambda module: module.__name__):
+        digest.update(inspect.getsource(module).encode())
+    _fingerprint(inputs, digest)
+    return digest.hexdigest()
+
+
+def _figure_html(caption, fig):
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=90, bbox_inches='tight')
+    plt.close(fig)
+    encoded = base64.b64encode(buffer.getvalue()).decode('ascii')
+    return (f'<figure><img alt="{html.escape(caption)}" src="data:image/png;base64,{encoded}">'
+            f'<figcaption>{html.escape(caption)}</figcaption></figure>')
+
+
+def _render_fragment(section_id, title, render, inputs):
+    findings, tables, charts = render(inputs)
+    parts = [f'<section id="{section_id}">', f'<h2>{html.escape(title)}</h2>']
+    if findings:
+        parts.append('<ul class="findings">')
+        parts.extend(f'<li>{html.escape(finding)}</li>' for finding in findings)
+        parts.append('</ul>')
+    for caption, table in tables:
+        parts.append(f'<h3>{html.escape(caption)}</h3>')
+        parts.append(table.to_html(border=0, classes='table',
+                                   float_format=lambda value: f'{value:,.2f}'))
+    parts.extend(_figure_html(caption, fig) for caption, fig in charts)
+    parts.append('</section>')
+    return '\n'.join(parts)
+
+
+PAGE = '''<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>BMW Sales Report</title>
+<style>
+body {{ font-family: Helvetica, Arial, sans-serif; margin: 2em auto; max-width: 1200px; color: #222; }}
+h1 {{ border-bottom: 3px solid #1c69d4; padding-bottom: 0.3em; }}
+h2 {{ margin-top: 2em; border-bottom: 1px solid #ccc; }}
+nav ul {{ columns: 3; }}
+table.table {{ border-collapse: collapse; font-size: 0.85em; margin: 0.5em 0 1.5em; }}
+table.table th, table.table td {{ padding: 4px 10px; border-bottom: 1px solid #e5e5e5; text-align: right; }}
+ul.findings li {{ margin: 0.3em 0; }}
+figure {{ margin: 1em 0; }}
+figure img {{ max-width: 100%; }}
+figcaption {{ color: #666; font-size: 0.85em; }}
+</style>
+</head>
+<body>
+<h1>BMW Sales Report</h1>
+<p>Generated {generated} from {raw_rows:,} raw and {cleaned_rows:,} cleaned records.</p>
+<nav><ul>
+{toc}
+</ul></nav>
+{body}
+</body>
+</html>
+'''
+
+
+def load_data(raw_path=RAW_PATH, cleaned_path=CLEANED_PATH, column_store_path=COLUMN_STORE_PATH):
+    raw = pd.read_csv(raw_path)
+    if os.path.isdir(column_store_path):
+        cleaned = open_column_store(column_store_path)
+    else:
+        cleaned = pd.read_csv(cleaned_path)
+    return {'raw': raw, 'cleaned': cleaned}
+
+
+def build_report(data=None, report_path=REPORT_PATH, cache_dir=CACHE_DIR, sections=None):
+    data = load_data() if data is None else data
+    sections = SECTIONS if sections is None else sections
+    fragment_dir = os.path.join(cache_dir, 'fragments')
+    os.makedirs(fragment_dir, exist_ok=True)
+
+    fragments, toc, summary, referenced = [], [], [], set()
+    current_group = None
+    for group, section_id, title, source, inputs_fn, render in sections:
+        start = time.perf_counter()
+        inputs = inputs_fn(data[source])
+        key = fragment_key(section_id, title, inputs, render)
+        path = os.path.join(fragment_dir, f'{section_id}-{key[:16]}.html')
+        referenced.add(os.path.basename(path))
+
+        cached = os.path.exists(path)
+        if cached:
+            with open(path, encoding='utf-8') as f:
+                fragment = f.read()
+        else:
+            fragment = _render_fragment(section_id, title, render, inputs)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(fragment)
+
+        if group != current_group:
+            fragments.append(f'<h1 class="group">{html.escape(group)}</h1>')
+            current_group = group
+        fragments.append(fragment)
+        toc.append(f'<li><a href="#{section_id}">{html.escape(group)}: {html.escape(title)}</a></li>')
+        summary.append({'Section': section_id, 'Cached': cached,
+                        'Seconds': round(time.perf_counter() - start, 2)})
+
+    page = PAGE.format(generated=pd.Timestamp.now().strftime('%Y-%m-%d %H:%M'),
+                       raw_rows=len(data['raw']), cleaned_rows=len(data['cleaned']),
+                       toc='\n'.join(toc), body='\n'.join(fragments))
+    os.makedirs(os.path.dirname(os.path.abspath(report_path)), exist_ok=True)
+    with open(report_path, 'w', encoding='utf-8') as f:
+        f.write(page)
+
+    # Fragments this build did not use belong to stale data or code and are never read again
+    for name in os.listdir(fragment_dir):
+        if name.endswith('.html') and name not in referenced:
+            os.remove(os.path.join(fragment_dir, name))
+
+    return pd.DataFrame(summary)
+
+
+def main():
+    print("Building report...")
+    summary = build_report()
+
+    print("\nSections:")
+    print(summary.to_string(index=False))
+    print(f"\nRegenerated {(~summary['Cached']).sum()} of {len(summary)} sections")
+    print(f"Report saved to: {REPORT_PATH}")
+
+
+if __name__ == "__main__":
+    main()
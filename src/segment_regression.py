@@ -0,0 +1,148 @@
+"""BMW Sales Data - Batched Segment Regression"""
+
+import numpy as np
+import pandas as pd
+
+
+FEATURES = ['Price_USD', 'Mileage_KM', 'Engine_Size_L', 'Vehicle_Age']
+SEGMENTS = ['Model', 'Region']
+
+
+class SegmentRegression:
+    def __init__(self, features=None, target='Sales_Volume', segments=None, ridge=0.0):
+        self.features = FEATURES if features is None else list(features)
+        self.target = target
+        self.segments = SEGMENTS if segments is None else list(segments)
+        self.ridge = ridge
+
+        # Sufficient statistics per segment: X'X, X'y, y'y and row counts
+        p = len(self.features) + 1
+        self.keys = []
+        self.slots = {}
+        self.xtx = np.zeros((0, p, p))
+        self.xty = np.zeros((0, p))
+        self.yty = np.zeros(0)
+        self.n = np.zeros(0)
+
+    def _slot_ids(self, chunk):
+        keys = pd.MultiIndex.from_frame(chunk[self.segments].astype(object))
+        codes, uniques = pd.factorize(keys)
+
+        new_keys = [key for key in uniques if key not in self.slots]
+        for key in new_keys:
+            self.slots[key] = len(self.keys)
+            self.keys.append(key)
+
+        if new_keys:
+            grow = len(new_keys)
+            p = self.xty.shape[1]
+            self.xtx = np.concatenate([self.xtx, np.zeros((grow, p, p))])
+            self.xty = np.concatenate([self.xty, np.zeros((grow, p))])
+            self.yty = np.concatenate([self.yty, np.zeros(grow)])
+            self.n = np.concatenate([self.n, np.zeros(grow)])
+
+        slot_of_code = np.array([self.slots[key] for key in uniques])
+        return slot_of_code[codes]
+
+    # One pass over the chunk: every segment's X'X and X'y via weighted bincounts
+    def partial_fit(self, chunk):
+        slots = self._slot_ids(chunk)
+        size = len(self.keys)
+
+        X = np.column_stack([np.ones(len(chunk))] + [chunk[col].to_numpy(dtype=float)
+                                                     for col in self.features])
+        y = chunk[self.target].to_numpy(dtype=float)
+        p = X.shape[1]
+
+        for i in range(p):
+            self.xty[:, i] += np.bincount(slots, weights=X[:, i] * y, minlength=size)
+            for j in range(i, p):
+                cross = np.bincount(slots, weights=X[:, i] * X[:, j], minlength=size)
+                self.xtx[:, i, j] += cross
+                if i != j:
+                    self.xtx[:, j, i] += cross
+
+        self.yty += np.bincount(slots, weights=y * y, minlength=size)
+        self.n += np.bincount(slots, minlength=size)
+        return self
+
+    def merge(self, other):
+        slots = self._slot_ids(pd.DataFrame(other.keys, columns=self.segments))
+        np.add.at(self.xtx, slots, other.xtx)
+        np.add.at(self.xty, slots, other.xty)
+        np.add.at(self.yty, slots, other.yty)
+        np.add.at(self.n, slots, other.n)
+        return self
+
+    # Ridge shrinks coefficients on the standardized scale: each feature is centered and
+    # scaled by its segment mean and standard deviation (both read off X'X), the penalized
+    # system is solved there and mapped back to the original units. The intercept is never
+    # shrunk. Returns the matrix that takes each segment's X'y to its coefficients.
+    def _ridge_inverse(self):
+        p = self.xty.shape[1]
+        means = self.xtx[:, 0, 1:] / self.n[:, None]
+        variances = np.diagonal(self.xtx, axis1=1, axis2=2)[:, 1:] / self.n[:, None] - means ** 2
+        scales = np.sqrt(np.clip(variances, 0, None))
+        scales[scales == 0] = 1.0  # a constant feature centers to zero and is shrunk away
+
+        # X = Z M for the standardized design Z, so Z'Z = M^-T X'X M^-1 and beta = M^-1 gamma
+        to_original = np.zeros_like(self.xtx)
+        to_original[:, 0, 0] = 1.0
+        to_original[:, 0, 1:] = -means / scales
+        to_original[:, np.arange(1, p), np.arange(1, p)] = 1.0 / scales
+        ztz = to_original.transpose(0, 2, 1) @ self.xtx @ to_original
+
+        penalty = self.ridge * np.eye(p)
+        penalty[0, 0] = 0.0
+        return to_original @ np.linalg.pinv(ztz + penalty) @ to_original.transpose(0, 2, 1)
+
+    # Solve all segments' normal equations in one batched linear-algebra call
+    def fit(self):
+        p = self.xty.shape[1]
+        A_inv = self._ridge_inverse() if self.ridge > 0 else np.linalg.pinv(self.xtx)
+        beta = np.einsum('sij,sj->si', A_inv, self.xty)
+
+        # Residual sum of squares straight from the sufficient statistics
+        rss = (self.yty
+               - 2 * np.einsum('si,si->s', beta, self.xty)
+               + np.einsum('si,sij,sj->s', beta, self.xtx, beta))
+        dof = self.n - p
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sigma2 = np.where(dof > 0, rss / dof, np.nan)
+            cov = sigma2[:, None, None] * (A_inv @ self.xtx @ A_inv)
+            se = np.sqrt(np.clip(np.diagonal(cov, axis1=1, axis2=2), 0, None))
+
+            y_mean = self.xty[:, 0] / self.n
+            tss = self.yty - self.n * y_mean ** 2
+            r2 = 1 - rss / tss
+
+        names = ['Intercept'] + self.features
+        result = pd.DataFrame(beta, columns=[f'coef_{name}' for name in names])
+        for k, name in enumerate(names):
+            result[f'se_{name}'] = se[:, k]
+        result['n'] = self.n.astype(int)
+        result['r2'] = r2
+
+        # Price elasticity of sales at the segment means
+        if 'Price_USD' in self.features:
+            price_index = names.index('Price_USD')
+            price_mean = self.xtx[:, 0, price_index] / self.n
+            result['Price_Elasticity'] = beta[:, price_index] * price_mean / y_mean
+
+        result.index = pd.MultiIndex.from_tuples(self.keys, names=self.segments)
+        return result.sort_index()
+
+
+# With a backend, df may be a lazy frame: only the needed columns stream through in chunks
+def fit_segments(df, chunksize=None, backend=None, **kwargs):
+    model = SegmentRegression(**kwargs)
+    if backend is not None:
+        columns = model.segments + model.features + [model.target]
+        for chunk in backend.iter_chunks(df, columns, chunksize or 100000):
+            model.partial_fit(chunk)
+        return model.fit()
+    if chunksize is None:
+        return model.partial_fit(df).fit()
+    for start in range(0, len(df), chunksize):
+        model.partial_fit(df.iloc[start:start + chunksize])
+    return model.fit()
@@ -0,0 +1,173 @@
+"""BMW Sales Data - Quantile and Distinct-Count Sketches"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+
+class KLLSketch:
+    def __init__(self, k=200, seed=None):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self.rng = np.random.default_rng(seed)
+
+    # Higher levels hold heavier items; lower levels shrink geometrically
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        self.n += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) <= self._capacity(level):
+                level += 1
+                continue
+
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+
+            # Keep one item back if the count is odd, promote every other sorted item
+            items = np.sort(items)
+            leftover = len(items) % 2
+            offset = self.rng.integers(0, 2)
+            promoted = items[leftover + offset::2]
+
+            self.levels[level] = items[:leftover]
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+
+            # Capacities depend on the number of levels, so rescan from the bottom
+            level = 0
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def quantile(self, q):
+        items = np.concatenate(self.levels)
+        if len(items) == 0:
+            return np.nan
+        weights = np.concatenate([np.full(len(level_items), 2.0 ** level)
+                                  for level, level_items in enumerate(self.levels)])
+
+        order = np.argsort(items)
+        cumulative = np.cumsum(weights[order])
+        positions = np.searchsorted(cumulative, np.asarray(q) * cumulative[-1])
+        return items[order][np.minimum(positions, len(items) - 1)]
+
+    # Approximate normalized rank error of the sketch
+    def rank_error(self):
+        return 1.7 / self.k
+
+    def to_bytes(self):
+        state = {
+            'k': self.k,
+            'n': self.n,
+            'levels': [items.tolist() for items in self.levels]
+        }
+        return json.dumps(state).encode('utf-8')
+
+    @classmethod
+    def from_bytes(cls, data, seed=None):
+        state = json.loads(data.decode('utf-8'))
+        sketch = cls(k=state['k'], seed=seed)
+        sketch.n = state['n']
+        sketch.levels = [np.asarray(items, dtype=float) for items in state['levels']]
+        return sketch
+
+
+class HyperLogLog:
+    def __init__(self, p=12):
+        self.p = p
+        self.m = 1 << p
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+
+    def update(self, values):
+        hashes = pd.util.hash_array(np.asarray(values, dtype=object))
+
+        # First p bits pick the register, the rest give the rank of the first 1-bit
+        index = (hashes >> np.uint64(64 - self.p)).astype(np.int64)
+        rest = hashes & np.uint64((1 << (64 - self.p)) - 1)
+        rank = (64 - self.p) - _bit_length(rest) + 1
+
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+        return self
+
+    def merge(self, other):
+        if other.p != self.p:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+        self.registers = np.maximum(self.registers, other.registers)
+        return self
+
+    def estimate(self):
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        raw = alpha * self.m ** 2 / np.sum(2.0 ** -self.registers.astype(float))
+
+        # Linear counting while many registers are still empty
+        zeros = np.count_nonzero(self.registers == 0)
+        if raw <= 2.5 * self.m and zeros > 0:
+            return self.m * np.log(self.m / zeros)
+        return raw
+
+    def to_bytes(self):
+        return bytes([self.p]) + self.registers.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data):
+        sketch = cls(p=data[0])
+        sketch.registers = np.frombuffer(data[1:], dtype=np.uint8).copy()
+        return sketch
+
+
+# Bit length of uint64 values, split into 32-bit halves so floats stay exact
+def _bit_length(values):
+    high = (values >> np.uint64(32)).astype(float)
+    low = (values & np.uint64(0xFFFFFFFF)).astype(float)
+    return np.where(high > 0, 32 + np.frexp(high)[1], np.frexp(low)[1])
+
+
+# One sketch per group, ready to be merged with sketches from other chunks
+def group_sketches(df, column, by, sketch_cls=KLLSketch, **kwargs):
+    sketches = {}
+    for key, values in df.groupby(by, observed=True)[column]:
+        sketches[key] = sketch_cls(**kwargs).update(values.to_numpy())
+    return sketches
+
+
+def merge_group_sketches(sketches, others):
+    for key, sketch in others.items():
+        if key in sketches:
+            sketches[key].merge(sketch)
+        else:
+            sketches[key] = sketch
+    return sketches
+
+
+def sketch_quantile(df, column, by=None, q=0.5, k=200):
+    if by is None:
+        return KLLSketch(k=k).update(df[column].to_numpy()).quantile(q)
+    sketches = group_sketches(df, column, by, k=k)
+    return pd.Series({key: sketch.quantile(q) for key, sketch in sketches.items()}, name=column)
+
+
+def sketch_nunique(df, column, by=None, p=12):
+    if by is None:
+        return int(round(HyperLogLog(p=p).update(df[column]).estimate()))
+    sketches = group_sketches(df, column, by, sketch_cls=HyperLogLog, p=p)
+    return pd.Series({key: int(round(sketch.estimate())) for key, sketch in sketches.items()},
+                     name=column)
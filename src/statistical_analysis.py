@@ -3,31 +3,93 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
-from scipy.stats import ttest_ind, f_oneway, chi2_contingency
+import os
 import warnings
 
+from approximate import open_reservoir
+from backends import get_backend
+from bitmap_index import BitmapIndex
+from column_store import open_column_store
+from forecasting import forecast_series
+from leaderboard import LEADERBOARDS, build_leaderboards
+from segment_regression import fit_segments
+from summaries import (category_summary, correlation, hypothesis_tests, key_findings, price_summary,
+                       sales_summary, temporal_summary, zoom)
+
 warnings.filterwarnings('ignore')
 
 pd.set_option('display.max_columns', None)
 sns.set_style('whitegrid')
 plt.rcParams['figure.figsize'] = (10, 5)
 
+# Approximate mode: answer aggregates from Model x Region reservoir samples
+APPROXIMATE = False
+SAMPLE_SIZE = 200
+
+# Compute medians with mergeable KLL sketches instead of exact sorts
+USE_SKETCHES = False
+
+# Analyse only these years, e.g. [2023, 2024] (reads the Year=/Region= partitioned dataset
+# and skips every other year's partitions); None analyses every year
+YEARS = None
+
+# Execution backend: 'pandas' (in memory) or 'polars' (lazy scan of the Parquet output;
+# only aggregated results are collected)
+BACKEND = 'pandas'
+CLEANED_PARQUET_PATH = '../data/BMW_sales_data_cleaned.parquet'
+COLUMN_STORE_PATH = '../data/BMW_sales_data_cleaned.columns'
+CLEANED_CSV_PATH = '../data/BMW_sales_data_cleaned.csv'
+PARTITIONED_PATH = '../data/BMW_sales_data_partitioned'
+RESERVOIR_PATH = '../data/.cache/reservoir.parquet'
+
+# Counters kept per revenue leaderboard (Space-Saving); None keeps exact totals
+LEADERBOARD_CAPACITY = None
+
 
 def main():
     print("Libraries loaded")
     
-    # Load the cleaned dataset
-    df = pd.read_csv('../data/BMW_sales_data_cleaned.csv')
+    # Lazy backends scan the Parquet output and never load the rows; pandas loads the
+    # cleaned dataset (memory-mapped column store when data_cleaning wrote one).
+    # With YEARS set, only those years' partitions of the partitioned dataset are read.
+    backend = get_backend(BACKEND)
+    year_filters = None
+    if YEARS is not None:
+        if not os.path.isdir(PARTITIONED_PATH):
+            raise FileNotFoundError(f"{PARTITIONED_PATH} not found. Run data_cleaning with SAVE_PARTITIONED = True")
+        source = PARTITIONED_PATH
+        year_filters = [('Year', 'in', list(YEARS))]
+        frame = backend.scan(source, filters=year_filters)
+        df = None if backend.lazy else frame
+    elif backend.lazy:
+        source = CLEANED_PARQUET_PATH
+        df = None
+        frame = backend.scan(source)
+    elif os.path.isdir(COLUMN_STORE_PATH):
+        source = COLUMN_STORE_PATH
+        df = frame = open_column_store(source)
+    else:
+        source = CLEANED_CSV_PATH
+        df = frame = pd.read_csv(source)
     
-    print(f"Dataset loaded: {df.shape[0]} rows, {df.shape[1]} columns")
+    n_rows, n_cols = backend.shape(frame)
+    print(f"Dataset loaded: {n_rows} rows, {n_cols} columns")
+    
+    # Bitmap index over the categorical dimensions for fast filtering
+    index = None if backend.lazy else BitmapIndex(df)
+    
+    reservoir = None
+    if APPROXIMATE:
+        # Sampled once per version of the cleaned data, then reused across runs
+        reservoir = open_reservoir(RESERVOIR_PATH, source, backend.iter_chunks(frame), size=SAMPLE_SIZE,
+                                   filters=year_filters)
+        print(f"Approximate mode: {SAMPLE_SIZE} samples per Model x Region stratum")
     print("\nFirst few rows:")
-    print(df.head())
+    print(backend.head(frame))
     
     # Correlation Analysis
     print("\n=== CORRELATION ANALYSIS ===")
-    numeric_cols = ['Price_USD', 'Sales_Volume', 'Mileage_KM', 'Engine_Size_L', 'Vehicle_Age']
-    
-    correlation_matrix = df[numeric_cols].corr()
+    correlation_matrix = correlation(frame, backend)
     
     print("Correlation between variables:")
     print(correlation_matrix.round(2))
@@ -40,29 +102,37 @@ def main():
     plt.tight_layout()
     plt.show()
     
+    # Segment Regression - Sales_Volume on price, mileage, engine size and age per Model x Region
+    print("\n=== SEGMENT REGRESSION ===")
+    segment_models = fit_segments(frame, backend=backend)
+    
+    print(f"Fitted {len(segment_models)} Model x Region segments")
+    print("Most price-sensitive segments (price elasticity of sales):")
+    print(segment_models[['coef_Price_USD', 'se_Price_USD', 'Price_Elasticity', 'r2', 'n']]
+          .sort_values('Price_Elasticity').head(5).round(4))
+    
     # Price Analysis - Average price by Model
     print("\n=== PRICE ANALYSIS ===")
-    price_by_model = df.groupby('Model')['Price_USD'].agg(['mean', 'median', 'std', 'count']).round(2)
-    price_by_model = price_by_model.sort_values('mean', ascending=False)
+    prices = price_summary(frame, backend, reservoir=reservoir, sketch=USE_SKETCHES)
+    price_by_model = prices['by_model']
     
     print("Average Price by Model:")
     print(price_by_model)
     
-    # Visualize price distribution by model
-    plt.figure(figsize=(12, 6))
-    df.boxplot(column='Price_USD', by='Model', figsize=(12, 6), patch_artist=True)
-    plt.suptitle('')
-    plt.title('Price Distribution by BMW Model', fontsize=14, fontweight='bold')
-    plt.xlabel('Model')
-    plt.ylabel('Price (USD)')
+    # Visualize price distribution by model (box statistics are computed by the backend)
+    box_stats = backend.box_stats(frame, 'Price_USD', 'Model')
+    fig, ax = plt.subplots(figsize=(12, 6))
+    ax.bxp([dict(stats, label=model) for model, stats in box_stats.iterrows()], patch_artist=True)
+    ax.set_title('Price Distribution by BMW Model', fontsize=14, fontweight='bold')
+    ax.set_xlabel('Model')
+    ax.set_ylabel('Price (USD)')
     plt.xticks(rotation=45)
-    plt.grid(axis='y', alpha=0.3)
+    ax.grid(axis='y', alpha=0.3)
     plt.tight_layout()
     plt.show()
     
     # Average price by Region
-    price_by_region = df.groupby('Region')['Price_USD'].agg(['mean', 'median', 'count']).round(2)
-    price_by_region = price_by_region.sort_values('mean', ascending=False)
+    price_by_region = prices['by_region']
     
     print("\nAverage Price by Region:")
     print(price_by_region)
@@ -75,12 +145,11 @@ def main():
     ax.set_title('Average Price by Region', fontsize=14, fontweight='bold')
     ax.grid(axis='x', alpha=0.3)
     plt.tight_layout()
-    plt.xlim(74000, 76000)
+    plt.xlim(*zoom(price_by_region['mean']))
     plt.show()
     
     # Price analysis by Fuel Type
-    price_by_fuel = df.groupby('Fuel_Type')['Price_USD'].agg(['mean', 'median', 'count']).round(2)
-    price_by_fuel = price_by_fuel.sort_values('mean', ascending=False)
+    price_by_fuel = prices['by_fuel']
     
     print("\nAverage Price by Fuel Type:")
     print(price_by_fuel)
@@ -95,17 +164,13 @@ def main():
     ax.set_xticklabels(ax.get_xticklabels(), rotation=0)
     ax.grid(axis='y', alpha=0.3)
     plt.tight_layout()
-    plt.ylim(74000, 76000)
+    plt.ylim(*zoom(price_by_fuel['mean']))
     plt.show()
     
     # Sales Volume Analysis
     print("\n=== SALES VOLUME ANALYSIS ===")
-    sales_by_model = df.groupby('Model')['Sales_Volume'].agg([
-        ('Total_Sales', 'sum'),
-        ('Avg_Sales', 'mean'),
-        ('Records', 'count')
-    ]).round(2)
-    sales_by_model = sales_by_model.sort_values('Total_Sales', ascending=False)
+    sales = sales_summary(frame, backend)
+    sales_by_model = sales['by_model']
     
     print("Sales Volume by Model:")
     print(sales_by_model)
@@ -120,7 +185,7 @@ def main():
     axes[0].set_ylabel('Total Sales Volume')
     axes[0].tick_params(axis='x', rotation=45)
     axes[0].grid(axis='y', alpha=0.3)
-    axes[0].set_ylim(21000000, 24000000)
+    axes[0].set_ylim(*zoom(sales_by_model['Total_Sales']))
     
     # Average sales
     sales_by_model['Avg_Sales'].plot(kind='bar', color='coral', edgecolor='black', ax=axes[1])
@@ -129,17 +194,13 @@ def main():
     axes[1].set_ylabel('Average Sales Volume')
     axes[1].tick_params(axis='x', rotation=45)
     axes[1].grid(axis='y', alpha=0.3)
-    axes[1].set_ylim(4900, 5200)
+    axes[1].set_ylim(*zoom(sales_by_model['Avg_Sales']))
     
     plt.tight_layout()
     plt.show()
     
     # Sales by Region
-    sales_by_region = df.groupby('Region')['Sales_Volume'].agg([
-        ('Total_Sales', 'sum'),
-        ('Avg_Sales', 'mean')
-    ]).round(2)
-    sales_by_region = sales_by_region.sort_values('Total_Sales', ascending=False)
+    sales_by_region = sales['by_region']
     
     print("\nSales Volume by Region:")
     print(sales_by_region)
@@ -152,22 +213,24 @@ def main():
     ax.set_title('Total Sales Volume by Region', fontsize=14, fontweight='bold')
     ax.grid(axis='x', alpha=0.3)
     plt.tight_layout()
-    plt.xlim(41000000, 44000000)
+    plt.xlim(*zoom(sales_by_region['Total_Sales']))
     plt.show()
     
     # Hypothesis Testing
     print("\n=== HYPOTHESIS TESTING ===")
     
+    # Lazy backends test from per-group counts, means and variances instead of the rows
+    hypotheses = hypothesis_tests(frame, backend, index=index)
+    tests = hypotheses['tests'].set_index('Test')
+    
     # Hypothesis 1: Price difference between Automatic and Manual
     print("\nHypothesis 1: Is there a significant difference in price between Automatic and Manual transmissions?")
-    automatic_prices = df[df['Transmission'] == 'Automatic']['Price_USD']
-    manual_prices = df[df['Transmission'] == 'Manual']['Price_USD']
-    
-    t_stat, p_value = ttest_ind(automatic_prices, manual_prices)
+    transmission_means = hypotheses['transmission_means']
+    p_value = tests.loc['t-test', 'P_Value']
     
     print("Testing: Price difference between Automatic vs Manual")
-    print(f"• Automatic avg: ${automatic_prices.mean():,.0f}")
-    print(f"• Manual avg: ${manual_prices.mean():,.0f}")
+    print(f"• Automatic avg: ${transmission_means['Automatic']:,.0f}")
+    print(f"• Manual avg: ${transmission_means['Manual']:,.0f}")
     print(f"• P-value: {p_value:.4f}")
     
     if p_value < 0.05:
@@ -177,14 +240,11 @@ def main():
     
     # Hypothesis 2: Sales volume across fuel types
     print("\nHypothesis 2: Is there a significant difference in sales volume across different fuel types?")
-    fuel_groups = [df[df['Fuel_Type'] == ft]['Sales_Volume'] for ft in df['Fuel_Type'].unique()]
-    
-    f_stat, p_value = f_oneway(*fuel_groups)
+    p_value = tests.loc['ANOVA', 'P_Value']
     
     print("Testing: Sales volume across fuel types")
-    for fuel_type in df['Fuel_Type'].unique():
-        sales = df[df['Fuel_Type'] == fuel_type]['Sales_Volume']
-        print(f"• {fuel_type}: {sales.mean():,.0f} avg sales")
+    for fuel_type, mean_sales in hypotheses['fuel_means'].items():
+        print(f"• {fuel_type}: {mean_sales:,.0f} avg sales")
     
     print(f"\nP-value: {p_value:.4f}")
     if p_value < 0.05:
@@ -194,12 +254,10 @@ def main():
     
     # Hypothesis 3: Sales Classification and Region
     print("\nHypothesis 3: Is there a significant relationship between Sales Classification and Region?")
-    contingency_table = pd.crosstab(df['Sales_Classification'], df['Region'])
-    
     print("Sales Classification vs Region:")
-    print(contingency_table)
+    print(hypotheses['contingency'])
     
-    chi2, p_value, dof, expected = chi2_contingency(contingency_table)
+    p_value = tests.loc['chi-square', 'P_Value']
     
     print(f"\nP-value: {p_value:.4f}")
     if p_value < 0.05:
@@ -209,14 +267,32 @@ def main():
     
     # Temporal Analysis
     print("\n=== TEMPORAL ANALYSIS ===")
-    yearly_trends = df.groupby('Year').agg({
-        'Sales_Volume': 'sum',
-        'Price_USD': 'mean'
-    }).round(0)
+    temporal = temporal_summary(frame, backend)
+    yearly_trends = temporal['yearly']
     
     print("Yearly Trends:")
     print(yearly_trends)
     
+    # YoY growth, rolling means and ranks for every Model, Region and Fuel_Type series
+    print("\nFastest-growing series in the latest year:")
+    print(temporal['movers'].to_string(index=False))
+    
+    # Forecasts for every Model x Region x Fuel_Type series, with a backtest per method
+    print("\n=== SALES FORECAST ===")
+    forecasts, backtest = forecast_series(frame, horizon=3, backend=backend)
+    
+    if len(backtest) > 0:
+        print("Backtest on the held-out last years (parameters tuned on earlier years):")
+        print(backtest.round(3).to_string(index=False))
+    else:
+        print("Too few years to backtest; using the naive forecast")
+    
+    print("\nForecast for the next 3 years (all series combined):")
+    print(forecasts.groupby('Year').agg(
+        Sales_Volume=('Sales_Volume_Forecast', 'sum'),
+        Avg_Price=('Avg_Price_Forecast', 'mean')
+    ).round(0))
+    
     # Visualize trends over time
     fig, axes = plt.subplots(2, 1, figsize=(14, 10))
     
@@ -241,10 +317,7 @@ def main():
     
     # Model Category Analysis
     print("\n=== MODEL CATEGORY ANALYSIS ===")
-    category_analysis = df.groupby('Model_Category').agg({
-        'Sales_Volume': 'sum',
-        'Price_USD': 'mean'
-    }).round(0)
+    category_analysis = category_summary(frame, backend)
     
     print("Sales and Price by Model Category:")
     print(category_analysis)
@@ -267,23 +340,32 @@ def main():
     axes[1].set_ylabel('Average Price (USD)')
     axes[1].tick_params(axis='x', rotation=45)
     axes[1].grid(axis='y', alpha=0.3)
-    axes[1].set_ylim(74000, 76000)
+    axes[1].set_ylim(*zoom(category_analysis['Price_USD']))
     
     plt.tight_layout()
     plt.show()
     
+    # Revenue leaderboards (Price_USD x Sales_Volume) over several dimension combinations
+    print("\n=== REVENUE LEADERBOARDS ===")
+    # Chunks carry only the leaderboard dimensions and the revenue inputs
+    leaderboard_columns = sorted({dim for combo in LEADERBOARDS for dim in combo}) + ['Price_USD', 'Sales_Volume']
+    leaderboards = build_leaderboards(backend.iter_chunks(frame, leaderboard_columns),
+                                      capacity=LEADERBOARD_CAPACITY)
+    
+    for combo, board in leaderboards.items():
+        print(f"\nTop 5 by estimated revenue: {' x '.join(combo)}")
+        print(board.top(5).round(0).to_string(index=False))
+    
     # Key Statistical Insights Summary
     print("\n=== KEY FINDINGS ===\n")
     
-    print(f"• Average price: ${df['Price_USD'].mean():,.0f}")
-    print(f"• Most expensive model: {price_by_model.index[0]} (${price_by_model.iloc[0]['mean']:,.0f})")
-    print(f"• Best seller: {sales_by_model.index[0]} ({sales_by_model.iloc[0]['Total_Sales']:,.0f} units)")
-    print(f"• Top region: {sales_by_region.index[0]}")
-    
-    fuel_pref = df['Fuel_Type'].value_counts()
-    trans_pref = df['Transmission'].value_counts()
-    print(f"• Popular fuel: {fuel_pref.index[0]} ({fuel_pref.iloc[0]} records)")
-    print(f"• Popular transmission: {trans_pref.index[0]}")
+    findings = key_findings(frame, prices, sales, backend)
+    print(f"• Average price: ${findings['avg_price']:,.0f}")
+    print(f"• Most expensive model: {findings['most_expensive'][0]} (${findings['most_expensive'][1]:,.0f})")
+    print(f"• Best seller: {findings['best_seller'][0]} ({findings['best_seller'][1]:,.0f} units)")
+    print(f"• Top region: {findings['top_region']}")
+    print(f"• Popular fuel: {findings['popular_fuel'][0]} ({findings['popular_fuel'][1]} records)")
+    print(f"• Popular transmission: {findings['popular_transmission']}")
 
 
 if __name__ == "__main__":
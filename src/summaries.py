@@ -0,0 +1,283 @@
+"""BMW Sales Data - Shared Section Summaries"""
+
+import numpy as np
+import pandas as pd
+from scipy.stats import ttest_ind, ttest_ind_from_stats, f_oneway, chi2_contingency, f as f_dist
+
+from approximate import aggregate, summarize
+from backends import get_backend
+from window_metrics import SERIES, TOTAL, top_movers, window_metrics
+
+
+# Every summary reduces the data (a DataFrame, or a lazy frame with its backend) to the
+# small aggregates a section prints or plots. The analysis scripts and the HTML report
+# both call these, so a section is computed the same way everywhere.
+
+NUMERIC_COLS = ['Price_USD', 'Sales_Volume', 'Mileage_KM', 'Engine_Size_L', 'Vehicle_Age']
+COUNT_COLS = ['Model', 'Region', 'Fuel_Type', 'Transmission', 'Sales_Classification']
+
+
+def _backend(backend):
+    return get_backend('pandas') if backend is None else backend
+
+
+# Axis limits around the data, so small differences between bars stay visible
+def zoom(values, pad=0.1):
+    low, high = float(np.min(values)), float(np.max(values))
+    margin = (high - low) * pad or abs(high) * 0.01 or 1.0
+    return low - margin, high + margin
+
+
+# Bin edges and counts as one frame: Left, Right and Count (one count column per group with by)
+def histogram(frame, column, backend=None, bins=30, by=None):
+    counts, edges = _backend(backend).histogram(frame, column, bins=bins, by=by)
+    hist = pd.DataFrame({'Left': edges[:-1], 'Right': edges[1:]})
+    if by is None:
+        hist['Count'] = np.asarray(counts)
+    else:
+        for group in counts.columns:
+            hist[str(group)] = counts[group].to_numpy()
+    return hist
+
+
+def plot_histogram(ax, hist, column='Count', **kwargs):
+    kwargs.setdefault('edgecolor', 'black')
+    ax.bar(hist['Left'], hist[column], width=hist['Right'] - hist['Left'], align='edge', **kwargs)
+
+
+# Exploration (raw data)
+
+def exploration_summary(frame, backend=None):
+    backend = _backend(backend)
+    n_rows, n_cols = backend.shape(frame)
+    counts = {col: backend.value_counts(frame, col) for col in COUNT_COLS}
+    models = counts['Model']
+    numeric_summary = backend.describe(frame).round(2)
+    return {
+        'overview': pd.Series({
+            'Records': n_rows,
+            'Columns': n_cols,
+            'Missing values': int(backend.null_counts(frame).sum()),
+            'Duplicate rows': int(backend.count_duplicates(frame))
+        }, name='Value'),
+        'numeric_summary': numeric_summary,
+        'counts': counts,
+        # Ties go to the first label in sort order, as with Series.mode()
+        'most_common_model': models[models == models.max()].index.min(),
+        'years': (int(numeric_summary.loc['min', 'Year']), int(numeric_summary.loc['max', 'Year']))
+    }
+
+
+# Statistical analysis (cleaned data)
+
+def correlation(frame, backend=None, columns=None):
+    return _backend(backend).corr(frame, NUMERIC_COLS if columns is None else columns)
+
+
+def price_summary(frame, backend=None, reservoir=None, sketch=False):
+    def by(column, hows):
+        result = summarize(frame, 'Price_USD', hows, by=column, reservoir=reservoir, sketch=sketch,
+                           backend=backend)
+        return result.round(2).sort_values('mean', ascending=False)
+
+    return {
+        'by_model': by('Model', ['mean', 'median', 'std', 'count']),
+        'by_region': by('Region', ['mean', 'median', 'count']),
+        'by_fuel': by('Fuel_Type', ['mean', 'median', 'count'])
+    }
+
+
+def sales_summary(frame, backend=None):
+    backend = _backend(backend)
+    by_model = backend.groupby_agg(frame, 'Model', {
+        'Total_Sales': ('Sales_Volume', 'sum'),
+        'Avg_Sales': ('Sales_Volume', 'mean'),
+        'Records': ('Sales_Volume', 'count')
+    }).round(2)
+    by_region = backend.groupby_agg(frame, 'Region', {
+        'Total_Sales': ('Sales_Volume', 'sum'),
+        'Avg_Sales': ('Sales_Volume', 'mean')
+    }).round(2)
+    return {
+        'by_model': by_model.sort_values('Total_Sales', ascending=False),
+        'by_region': by_region.sort_values('Total_Sales', ascending=False)
+    }
+
+
+# One-way ANOVA from per-group counts, means and variances
+def anova_from_stats(n, mean, var):
+    grand_mean = (n * mean).sum() / n.sum()
+    between = (n * (mean - grand_mean) ** 2).sum() / (len(n) - 1)
+    within = ((n - 1) * var).sum() / (n.sum() - len(n))
+    f_stat = between / within
+    return f_stat, f_dist.sf(f_stat, len(n) - 1, n.sum() - len(n))
+
+
+# The three hypothesis tests. With a bitmap index (in-memory data) the tests run on the
+# row subsets; otherwise they run from per-group counts, means and variances, so lazy
+# backends never collect the rows. Both give the same statistics.
+def hypothesis_tests(frame, backend=None, index=None):
+    backend = _backend(backend)
+
+    def group_stats(by, column):
+        return backend.groupby_agg(frame, by, {
+            'n': (column, 'count'), 'mean': (column, 'mean'), 'var': (column, 'var')
+        }).sort_index()
+
+    transmission = group_stats('Transmission', 'Price_USD')
+    fuel = group_stats('Fuel_Type', 'Sales_Volume')
+
+    if index is not None:
+        automatic = index.subset(frame, Transmission='Automatic')['Price_USD']
+        manual = index.subset(frame, Transmission='Manual')['Price_USD']
+        t_test = ttest_ind(automatic, manual)
+        anova = f_oneway(*[index.subset(frame, Fuel_Type=fuel_type)['Sales_Volume'] for fuel_type in fuel.index])
+    else:
+        automatic, manual = transmission.loc['Automatic'], transmission.loc['Manual']
+        t_test = ttest_ind_from_stats(automatic['mean'], np.sqrt(automatic['var']), automatic['n'],
+                                      manual['mean'], np.sqrt(manual['var']), manual['n'])
+        anova = anova_from_stats(fuel['n'], fuel['mean'], fuel['var'])
+
+    contingency = backend.groupby_agg(frame, ['Sales_Classification', 'Region'], {
+        'count': ('Sales_Volume', 'count')
+    })['count'].unstack(fill_value=0)
+
+    tests = pd.DataFrame([
+        ('Price: Automatic vs Manual transmission', 't-test', *t_test),
+        ('Sales volume across fuel types', 'ANOVA', *anova),
+        ('Sales classification vs region', 'chi-square', *chi2_contingency(contingency)[:2])
+    ], columns=['Hypothesis', 'Test', 'Statistic', 'P_Value'])
+    tests['Significant'] = tests['P_Value'] < 0.05
+    return {
+        'tests': tests,
+        'transmission_means': transmission['mean'],
+        'fuel_means': fuel['mean'],
+        'contingency': contingency
+    }
+
+
+# Yearly totals with YoY growth, and the fastest-growing series. The all-market series
+# comes out of the same cube as the Model, Region and Fuel_Type series, so its YoY is taken
+# on the exact yearly totals and lined up by year, and only the displayed values are rounded.
+def temporal_summary(frame, backend=None):
+    metrics = window_metrics(frame, series=SERIES + [TOTAL], backend=backend)
+    overall = metrics['Dimension'] == 'All'
+
+    yearly = metrics[overall].set_index('Year')
+    yearly = pd.DataFrame({
+        'Sales_Volume': yearly['Total_Sales'].round(0),
+        'Price_USD': yearly['Avg_Price'].round(0),
+        'Sales_YoY_Pct': yearly['Sales_YoY_Pct'],
+        'Price_YoY_Pct': yearly['Price_YoY_Pct']
+    })
+
+    # YoY growth, rolling means and ranks for every Model, Region and Fuel_Type series
+    movers = top_movers(metrics[~overall])[['Dimension', 'Member', 'Total_Sales', 'Sales_YoY_Pct', 'Sales_Rank']]
+    return {'yearly': yearly, 'movers': movers.reset_index(drop=True)}
+
+
+def category_summary(frame, backend=None):
+    return _backend(backend).groupby_agg(frame, 'Model_Category', {
+        'Sales_Volume': ('Sales_Volume', 'sum'),
+        'Price_USD': ('Price_USD', 'mean')
+    }).round(0)
+
+
+# Headline findings, read off the price and sales summaries of the same data
+def key_findings(frame, prices, sales, backend=None):
+    backend = _backend(backend)
+    by_price, by_sales = prices['by_model'], sales['by_model']
+    fuel = backend.value_counts(frame, 'Fuel_Type')
+    return {
+        'avg_price': backend.aggregate(frame, {'avg_price': ('Price_USD', 'mean')})['avg_price'],
+        'most_expensive': (by_price.index[0], by_price['mean'].iloc[0]),
+        'best_seller': (by_sales.index[0], by_sales['Total_Sales'].iloc[0]),
+        'top_region': sales['by_region'].index[0],
+        'popular_fuel': (fuel.index[0], int(fuel.iloc[0])),
+        'popular_transmission': backend.value_counts(frame, 'Transmission').index[0]
+    }
+
+
+# Visualizations (cleaned data)
+
+def distribution_summary(frame, backend=None):
+    means = _backend(backend).aggregate(frame, {
+        'Price_USD': ('Price_USD', 'mean'),
+        'Sales_Volume': ('Sales_Volume', 'mean')
+    })
+    return {
+        'price': histogram(frame, 'Price_USD', backend),
+        'sales': histogram(frame, 'Sales_Volume', backend),
+        'means': means
+    }
+
+
+# Totals behind the dashboards: sales by model, region and year, price by fuel type and year
+def sales_dashboard(frame, backend=None, reservoir=None):
+    backend = _backend(backend)
+
+    def estimate(column, how, by):
+        return aggregate(frame, column, how, by=by, reservoir=reservoir, backend=backend)
+
+    overall = backend.aggregate(frame, {
+        'total_sales': ('Sales_Volume', 'sum'),
+        'records': ('Sales_Volume', 'count'),
+        'first_year': ('Year', 'min'),
+        'last_year': ('Year', 'max')
+    })
+    return {
+        'model_sales': estimate('Sales_Volume', 'sum', 'Model')['estimate'].sort_values(ascending=False),
+        'region_sales': estimate('Sales_Volume', 'sum', 'Region')['estimate'],
+        'fuel_price': estimate('Price_USD', 'mean', 'Fuel_Type')['estimate'].sort_values(),
+        'model_price': estimate('Price_USD', 'mean', 'Model')['estimate'].sort_values(ascending=False),
+        'yearly_sales': estimate('Sales_Volume', 'sum', 'Year'),
+        'yearly_price': estimate('Price_USD', 'mean', 'Year')['estimate'],
+        'transmission': backend.value_counts(frame, 'Transmission'),
+        'records': int(overall['records']),
+        'years': (int(overall['first_year']), int(overall['last_year'])),
+        'total_sales': overall['total_sales']
+    }
+
+
+def model_region_heatmap(frame, backend=None):
+    return _backend(backend).pivot_table(frame, values='Sales_Volume', index='Model', columns='Region',
+                                         aggfunc='mean')
+
+
+# Records per year for each fuel type and for the three most common models (long format)
+def popularity_trends(frame, backend=None, index=None):
+    backend = _backend(backend)
+    fuel_yearly = backend.groupby_agg(frame, ['Year', 'Fuel_Type'], {
+        'Count': ('Sales_Volume', 'count')
+    }).reset_index()
+
+    top_3_models = backend.value_counts(frame, 'Model').head(3).index
+    if index is not None:
+        top_3_frame = index.subset(frame, Model=top_3_models)
+    else:
+        top_3_frame = backend.filter(frame, [('Model', 'in', list(top_3_models))])
+    model_yearly = backend.groupby_agg(top_3_frame, ['Year', 'Model'], {
+        'Count': ('Sales_Volume', 'count')
+    }).reset_index()
+    return {'fuel_yearly': fuel_yearly, 'model_yearly': model_yearly}
+
+
+def regional_summary(frame, backend=None):
+    return _backend(backend).groupby_agg(frame, 'Region', {
+        'Total_Sales': ('Sales_Volume', 'sum'),
+        'Avg_Price': ('Price_USD', 'mean'),
+        'Number_of_Records': ('Model', 'count')
+    })
+
+
+# Price and volume histograms per sales class over shared bin edges, and the average price
+def high_low_summary(frame, backend=None):
+    backend = _backend(backend)
+    avg_price = backend.groupby_agg(frame, 'Sales_Classification', {
+        'Avg_Price': ('Price_USD', 'mean')
+    })['Avg_Price']
+    return {
+        'avg_price': avg_price,
+        'Price_USD': histogram(frame, 'Price_USD', backend, by='Sales_Classification'),
+        'Sales_Volume': histogram(frame, 'Sales_Volume', backend, by='Sales_Classification')
+    }
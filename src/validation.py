@@ -0,0 +1,185 @@
+"""BMW Sales Data - Data Validation"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from features import CURRENT_YEAR
+
+
+HIGH_SALES_THRESHOLD = 7000
+
+# Column rules: required (no nulls), dtype ('int'/'float' coerce, bad values become nulls),
+# min/max (inclusive), gt (exclusive), allowed (category set), pattern (regex that must match).
+# Bounds follow the consumers: add_features() bins Price_USD, Mileage_KM and the model's series
+# digit into right-closed (0, ...] bins, so those must be above 0; an engine size of 0 (electric)
+# and a sales volume of 0 are real values that nothing divides by or bins.
+SCHEMA = {
+    # The first digit is the series number, binned by Model_Category
+    'Model': {'required': True, 'pattern': r'^\D*[1-9]'},
+    # A current-year row would get Vehicle_Age 0, outside every Age_Group bin
+    'Year': {'required': True, 'dtype': 'int', 'min': 2010, 'max': CURRENT_YEAR - 1},
+    'Region': {'required': True, 'allowed': ['Africa', 'Asia', 'Europe', 'Middle East',
+                                             'North America', 'South America']},
+    'Color': {'required': True},
+    'Fuel_Type': {'required': True, 'allowed': ['Diesel', 'Electric', 'Hybrid', 'Petrol']},
+    'Transmission': {'required': True, 'allowed': ['Automatic', 'Manual']},
+    'Engine_Size_L': {'required': True, 'dtype': 'float', 'min': 0, 'max': 10},
+    'Mileage_KM': {'required': True, 'dtype': 'int', 'gt': 0},
+    'Price_USD': {'required': True, 'dtype': 'int', 'gt': 0},
+    'Sales_Volume': {'required': True, 'dtype': 'int', 'min': 0},
+    'Sales_Classification': {'required': True, 'allowed': ['High', 'Low']}
+}
+
+DTYPES = {'int': 'int64', 'float': 'float64'}
+
+# Cross-field rules are named for the failure and return True for rows that pass.
+# 'error' rows are quarantined, 'warn' rows are only counted.
+CROSS_RULES = [
+    {
+        'name': 'Sales_Classification inconsistent with Sales_Volume threshold',
+        'severity': 'error',
+        'check': lambda df: (df['Sales_Classification'] == 'High') == (df['Sales_Volume'] >= HIGH_SALES_THRESHOLD)
+    },
+    {
+        # The source data reports a nominal engine size for electric cars too
+        'name': 'Electric vehicle reports an engine size',
+        'severity': 'warn',
+        'check': lambda df: (df['Fuel_Type'] != 'Electric') | (df['Engine_Size_L'] == 0)
+    }
+]
+
+
+class Validator:
+    def __init__(self, schema=None, rules=None):
+        self.schema = SCHEMA if schema is None else schema
+        self.rules = CROSS_RULES if rules is None else rules
+        self.counts = {}
+
+    def _coerce(self, chunk):
+        chunk = chunk.copy()
+        for column, spec in self.schema.items():
+            if spec.get('dtype') in ('int', 'float') and column in chunk:
+                chunk[column] = pd.to_numeric(chunk[column], errors='coerce')
+        return chunk
+
+    # All checks as boolean failure masks over the whole chunk
+    def _failures(self, chunk):
+        failures = []
+        for column, spec in self.schema.items():
+            if column not in chunk:
+                failures.append((f'{column} missing', 'error', np.ones(len(chunk), dtype=bool)))
+                continue
+
+            values = chunk[column]
+            present = values.notna()
+            if spec.get('required'):
+                failures.append((f'{column} is null or malformed', 'error', ~present))
+            if spec.get('dtype') == 'int':
+                failures.append((f'{column} not an integer', 'error', present & (values % 1 != 0)))
+            if 'min' in spec:
+                failures.append((f'{column} < {spec["min"]}', 'error', present & (values < spec['min'])))
+            if 'max' in spec:
+                failures.append((f'{column} > {spec["max"]}', 'error', present & (values > spec['max'])))
+            if 'gt' in spec:
+                failures.append((f'{column} <= {spec["gt"]}', 'error', present & (values <= spec['gt'])))
+            if 'allowed' in spec:
+                failures.append((f'{column} not an allowed value', 'error',
+                                 present & ~values.isin(spec['allowed'])))
+            if 'pattern' in spec:
+                # Only present values are matched; nulls are reported by the required rule alone
+                mismatched = np.zeros(len(chunk), dtype=bool)
+                mismatched[present.to_numpy()] = ~values[present].astype(str).str.contains(
+                    spec['pattern'], regex=True).to_numpy(dtype=bool)
+                failures.append((f'{column} does not match {spec["pattern"]}', 'error', mismatched))
+
+        for rule in self.rules:
+            passed = rule['check'](chunk).fillna(False)
+            failures.append((rule['name'], rule['severity'], ~passed.to_numpy(dtype=bool)))
+
+        return [(name, severity, np.asarray(mask, dtype=bool)) for name, severity, mask in failures]
+
+    # Split a chunk into valid rows and quarantined rows (with an _errors column)
+    def validate(self, chunk):
+        chunk = self._coerce(chunk)
+        failures = self._failures(chunk)
+
+        bad = np.zeros(len(chunk), dtype=bool)
+        for name, severity, mask in failures:
+            self.counts[(name, severity)] = self.counts.get((name, severity), 0) + int(mask.sum())
+            if severity == 'error':
+                bad |= mask
+
+        quarantined = chunk[bad].copy()
+        errors = pd.Series('', index=quarantined.index)
+        for name, severity, mask in failures:
+            if severity == 'error':
+                hit = mask[bad]
+                errors[hit] = errors[hit] + name + '; '
+        quarantined['_errors'] = errors.str.rstrip('; ')
+
+        # Fixed dtypes, so every chunk (even an empty one) has the same schema
+        valid = chunk[~bad]
+        for column, spec in self.schema.items():
+            if spec.get('dtype') in DTYPES and column in valid:
+                valid = valid.astype({column: DTYPES[spec['dtype']]})
+        return valid, quarantined
+
+    def report(self):
+        rows = [{'Rule': name, 'Severity': severity, 'Failures': count}
+                for (name, severity), count in self.counts.items()]
+        return pd.DataFrame(rows, columns=['Rule', 'Severity', 'Failures'])
+
+
+# Stream a CSV in chunks, appending bad rows to the quarantine file as they are found
+def iter_valid_chunks(path, quarantine_path, validator, chunksize=100000):
+    if os.path.exists(quarantine_path):
+        os.remove(quarantine_path)
+
+    for chunk in pd.read_csv(path, chunksize=chunksize, dtype=str):
+        valid, quarantined = validator.validate(chunk)
+        if len(quarantined) > 0:
+            quarantined.to_csv(quarantine_path, mode='a', index=False,
+                               header=not os.path.exists(quarantine_path))
+        yield valid
+
+
+def validate_csv(path, quarantine_path, chunksize=100000, validator=None):
+    validator = Validator() if validator is None else validator
+    chunks = list(iter_valid_chunks(path, quarantine_path, validator, chunksize))
+    return pd.concat(chunks, ignore_index=True), validator.report()
+
+
+# Stream validated chunks into one Parquet file, so lazy backends only ever scan valid rows
+def validate_to_parquet(path, parquet_path, quarantine_path, chunksize=100000, validator=None):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Validating into Parquet needs pyarrow: pip install pyarrow")
+
+    validator = Validator() if validator is None else validator
+    writer = None
+    try:
+        for valid in iter_valid_chunks(path, quarantine_path, validator, chunksize):
+            table = pa.Table.from_pandas(valid, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(parquet_path, table.schema)
+            writer.write_table(table.cast(writer.schema))
+        # Every row was quarantined (or the CSV had none): still leave a zero-row file with
+        # the schema's columns, so readers find the output and a stale file is not kept
+        if writer is None:
+            writer = pq.ParquetWriter(parquet_path, _empty_table(validator.schema).schema)
+    finally:
+        if writer is not None:
+            writer.close()
+    return validator.report()
+
+
+# Zero-row table with the dtypes validated chunks have: int64, float64 or string columns
+def _empty_table(schema):
+    import pyarrow as pa
+
+    types = {'int': pa.int64(), 'float': pa.float64()}
+    return pa.schema([(column, types.get(spec.get('dtype'), pa.large_string())) for column, spec in schema.items()]).empty_table()
@@ -4,53 +4,116 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import plotly.express as px
+import plotly.graph_objects as go
+import os
 import warnings
 
+from approximate import open_reservoir
+from backends import get_backend
+from bitmap_index import BitmapIndex
+from column_store import open_column_store
+from summaries import (correlation, distribution_summary, high_low_summary, model_region_heatmap,
+                       plot_histogram, popularity_trends, regional_summary, sales_dashboard, zoom)
+
 warnings.filterwarnings('ignore')
 
 pd.set_option('display.max_columns', None)
 sns.set_palette("husl")
 
+# Approximate mode: answer aggregates from Model x Region reservoir samples
+APPROXIMATE = False
+SAMPLE_SIZE = 200
+
+# Analyse only these years, e.g. [2023, 2024] (reads the Year=/Region= partitioned dataset
+# and skips every other year's partitions); None analyses every year
+YEARS = None
+
+# Execution backend: 'pandas' (in memory) or 'polars' (lazy scan of the Parquet output;
+# only aggregated results are collected)
+BACKEND = 'pandas'
+CLEANED_PARQUET_PATH = '../data/BMW_sales_data_cleaned.parquet'
+COLUMN_STORE_PATH = '../data/BMW_sales_data_cleaned.columns'
+CLEANED_CSV_PATH = '../data/BMW_sales_data_cleaned.csv'
+PARTITIONED_PATH = '../data/BMW_sales_data_partitioned'
+RESERVOIR_PATH = '../data/.cache/reservoir.parquet'
+
 
 def main():
     print("Libraries loaded successfully!")
     
-    # Load the cleaned dataset
-    df = pd.read_csv('../data/BMW_sales_data_cleaned.csv')
-    
-    print(f"Dataset: {df.shape[0]} rows, {df.shape[1]} columns")
+    # Lazy backends scan the Parquet output and never load the rows; pandas loads the
+    # cleaned dataset (memory-mapped column store when data_cleaning wrote one).
+    # With YEARS set, only those years' partitions of the partitioned dataset are read.
+    backend = get_backend(BACKEND)
+    year_filters = None
+    if YEARS is not None:
+        if not os.path.isdir(PARTITIONED_PATH):
+            raise FileNotFoundError(f"{PARTITIONED_PATH} not found. Run data_cleaning with SAVE_PARTITIONED = True")
+        source = PARTITIONED_PATH
+        year_filters = [('Year', 'in', list(YEARS))]
+        frame = backend.scan(source, filters=year_filters)
+        df = None if backend.lazy else frame
+    elif backend.lazy:
+        source = CLEANED_PARQUET_PATH
+        df = None
+        frame = backend.scan(source)
+    elif os.path.isdir(COLUMN_STORE_PATH):
+        source = COLUMN_STORE_PATH
+        df = frame = open_column_store(source)
+    else:
+        source = CLEANED_CSV_PATH
+        df = frame = pd.read_csv(source)
+    
+    n_rows, n_cols = backend.shape(frame)
+    print(f"Dataset: {n_rows} rows, {n_cols} columns")
+    
+    # Bitmap index over the categorical dimensions for fast filtering
+    index = None if backend.lazy else BitmapIndex(df)
+    
+    reservoir = None
+    if APPROXIMATE:
+        # Sampled once per version of the cleaned data, then reused across runs
+        reservoir = open_reservoir(RESERVOIR_PATH, source, backend.iter_chunks(frame), size=SAMPLE_SIZE,
+                                   filters=year_filters)
+        print(f"Approximate mode: {SAMPLE_SIZE} samples per Model x Region stratum")
     print("Ready for visualization!")
     
-    # Price distribution
+    # Price distribution (bin counts come from the backend; the bars are drawn from them)
     print("\n=== PRICE AND SALES DISTRIBUTIONS ===")
-    plt.figure(figsize=(10, 6))
-    plt.hist(df['Price_USD'], bins=30, color='skyblue', edgecolor='black')
-    plt.title('Price Distribution', fontsize=12)
-    plt.xlabel('Price (USD)')
-    plt.ylabel('Count')
-    plt.axvline(df['Price_USD'].mean(), color='red', linestyle='--', 
-                label=f"Avg: ${df['Price_USD'].mean():,.0f}")
-    plt.legend()
-    plt.grid(alpha=0.3)
+    distributions = distribution_summary(frame, backend)
+    means = distributions['means']
+    
+    fig, ax = plt.subplots(figsize=(10, 6))
+    plot_histogram(ax, distributions['price'], color='skyblue')
+    ax.set_title('Price Distribution', fontsize=12)
+    ax.set_xlabel('Price (USD)')
+    ax.set_ylabel('Count')
+    ax.axvline(means['Price_USD'], color='red', linestyle='--', 
+               label=f"Avg: ${means['Price_USD']:,.0f}")
+    ax.legend()
+    ax.grid(alpha=0.3)
+    ax.set_ylim(*zoom(distributions['price']['Count']))
     plt.tight_layout()
-    plt.ylim(1500, 1750)
     plt.show()
     
     # Sales volume distribution
-    plt.figure(figsize=(10, 6))
-    plt.hist(df['Sales_Volume'], bins=30, color='lightcoral', edgecolor='black')
-    plt.title('Sales Volume Distribution', fontsize=12)
-    plt.xlabel('Sales Volume')
-    plt.ylabel('Count')
-    plt.axvline(df['Sales_Volume'].mean(), color='red', linestyle='--',
-                label=f"Avg: {df['Sales_Volume'].mean():,.0f}")
-    plt.legend()
-    plt.grid(alpha=0.3)
+    fig, ax = plt.subplots(figsize=(10, 6))
+    plot_histogram(ax, distributions['sales'], color='lightcoral')
+    ax.set_title('Sales Volume Distribution', fontsize=12)
+    ax.set_xlabel('Sales Volume')
+    ax.set_ylabel('Count')
+    ax.axvline(means['Sales_Volume'], color='red', linestyle='--',
+               label=f"Avg: {means['Sales_Volume']:,.0f}")
+    ax.legend()
+    ax.grid(alpha=0.3)
+    ax.set_ylim(*zoom(distributions['sales']['Count']))
     plt.tight_layout()
-    plt.ylim(1500, 1750)
     plt.show()
     
-    print(f"Avg Price: ${df['Price_USD'].mean():,.0f} | Avg Sales: {df['Sales_Volume'].mean():,.0f}")
+    print(f"Avg Price: ${means['Price_USD']:,.0f} | Avg Sales: {means['Sales_Volume']:,.0f}")
+    
+    # Totals behind both dashboards (reservoir estimates in approximate mode)
+    dashboard = sales_dashboard(frame, backend, reservoir=reservoir)
     
     # Category comparison dashboard - 2x2 layout
     print("\n=== CATEGORY COMPARISON DASHBOARD ===")
@@ -58,38 +121,38 @@ def main():
     
     # 1. Total sales by BMW model (top-left)
     ax1 = plt.subplot(2, 2, 1)
-    model_sales = df.groupby('Model')['Sales_Volume'].sum().sort_values(ascending=False)
+    model_sales = dashboard['model_sales']
     ax1.bar(model_sales.index, model_sales.values, color='steelblue', edgecolor='black')
     ax1.set_title('Total Sales by BMW Model', fontsize=12, fontweight='bold')
     ax1.set_xlabel('Model', fontsize=10)
     ax1.set_ylabel('Total Sales Volume', fontsize=10)
     ax1.tick_params(axis='x', rotation=45)
     ax1.grid(axis='y', alpha=0.3)
-    ax1.set_ylim(22000000, 24000000)
+    ax1.set_ylim(*zoom(model_sales))
     
     # 2. Average price by fuel type (top-right)
     ax2 = plt.subplot(2, 2, 2)
-    fuel_price = df.groupby('Fuel_Type')['Price_USD'].mean().sort_values()
+    fuel_price = dashboard['fuel_price']
     ax2.barh(fuel_price.index, fuel_price.values, color='coral', edgecolor='black')
     ax2.set_title('Average Price by Fuel Type', fontsize=12, fontweight='bold')
     ax2.set_xlabel('Average Price (USD)', fontsize=10)
     ax2.set_ylabel('Fuel Type', fontsize=10)
     ax2.grid(axis='x', alpha=0.3)
-    ax2.set_xlim(74000, 76000)
+    ax2.set_xlim(*zoom(fuel_price))
     
     # 3. Sales by region (bottom-left)
     ax3 = plt.subplot(2, 2, 3)
-    region_sales = df.groupby('Region')['Sales_Volume'].sum().sort_values()
+    region_sales = dashboard['region_sales'].sort_values()
     ax3.barh(region_sales.index, region_sales.values, color='lightgreen', edgecolor='black')
     ax3.set_title('Total Sales by Region', fontsize=12, fontweight='bold')
     ax3.set_xlabel('Total Sales Volume', fontsize=10)
     ax3.set_ylabel('Region', fontsize=10)
     ax3.grid(axis='x', alpha=0.3)
-    ax3.set_xlim(40000000, 44000000)
+    ax3.set_xlim(*zoom(region_sales))
     
     # 4. Distribution by transmission type (bottom-right)
     ax4 = plt.subplot(2, 2, 4)
-    trans_counts = df['Transmission'].value_counts()
+    trans_counts = dashboard['transmission']
     colors_trans = ['#3498db', '#e74c3c']
     ax4.pie(trans_counts, labels=trans_counts.index, autopct='%1.1f%%', 
             colors=colors_trans, startangle=90, textprops={'fontsize': 10})
@@ -103,15 +166,23 @@ def main():
     plt.show()
     
     print("Category comparison dashboard created")
-    print(f"Models analyzed: {df['Model'].nunique()}")
-    print(f"Regions covered: {df['Region'].nunique()}")
-    print(f"Fuel types: {df['Fuel_Type'].nunique()}")
+    distinct = backend.aggregate(frame, {
+        column: (column, 'nunique') for column in ['Model', 'Region', 'Fuel_Type']
+    })
+    print(f"Models analyzed: {distinct['Model']}")
+    print(f"Regions covered: {distinct['Region']}")
+    print(f"Fuel types: {distinct['Fuel_Type']}")
     
     # Exploring Relationships Between Variables
     print("\n=== TRENDS OVER TIME ===")
     
     # Sales trend over years
-    yearly_sales = df.groupby('Year')['Sales_Volume'].sum()
+    yearly_sales_result = dashboard['yearly_sales']
+    yearly_sales = yearly_sales_result['estimate']
+    if reservoir is not None:
+        print("Estimated yearly sales (95% confidence interval):")
+        print(yearly_sales_result.round(0))
+    
     plt.figure(figsize=(10, 6))
     plt.plot(yearly_sales.index, yearly_sales.values, marker='o', 
              linewidth=2, markersize=6, color='green')
@@ -123,7 +194,7 @@ def main():
     plt.show()
     
     # Price trend over years
-    yearly_price = df.groupby('Year')['Price_USD'].mean()
+    yearly_price = dashboard['yearly_price']
     plt.figure(figsize=(10, 6))
     plt.plot(yearly_price.index, yearly_price.values, marker='s', 
              linewidth=2, markersize=6, color='blue')
@@ -138,7 +209,7 @@ def main():
     print("\n=== INTERACTIVE VISUALIZATIONS ===")
     
     # Bar chart showing average price by model
-    avg_price_model = df.groupby('Model')['Price_USD'].mean().sort_values(ascending=False).reset_index()
+    avg_price_model = dashboard['model_price'].rename('Price_USD').reset_index()
     
     fig = px.bar(avg_price_model, x='Model', y='Price_USD',
                  title='Average Price by BMW Model',
@@ -146,25 +217,26 @@ def main():
                  color='Price_USD',
                  color_continuous_scale='Blues')
     fig.update_layout(height=500)
-    fig.update_yaxes(range=[74000, 76000])
+    fig.update_yaxes(range=list(zoom(avg_price_model['Price_USD'])))
     fig.show()
     
-    # Box plot to compare price distributions
-    fig = px.box(df, x='Fuel_Type', y='Price_USD',
-                 title='Price Distribution by Fuel Type',
-                 labels={'Price_USD': 'Price (USD)', 'Fuel_Type': 'Fuel Type'},
-                 color='Fuel_Type')
-    fig.update_layout(height=500, showlegend=False)
+    # Box plot to compare price distributions (precomputed box statistics and fliers per fuel type)
+    box_stats = backend.box_stats(frame, 'Price_USD', 'Fuel_Type')
+    fig = go.Figure([
+        go.Box(name=fuel_type, x=[fuel_type], q1=[stats['q1']], median=[stats['med']], q3=[stats['q3']],
+               lowerfence=[stats['whislo']], upperfence=[stats['whishi']],
+               y=[stats['fliers']], boxpoints='all', jitter=0, pointpos=0)
+        for fuel_type, stats in box_stats.iterrows()
+    ])
+    fig.update_layout(title='Price Distribution by Fuel Type', xaxis_title='Fuel Type',
+                      yaxis_title='Price (USD)', height=500, showlegend=False)
     fig.show()
     
     # Heatmaps to See Patterns
     print("\n=== HEATMAPS ===")
     
     # Heatmap: Average sales by Model and Region
-    heatmap_data = df.pivot_table(values='Sales_Volume', 
-                                   index='Model', 
-                                   columns='Region', 
-                                   aggfunc='mean')
+    heatmap_data = model_region_heatmap(frame, backend)
     
     plt.figure(figsize=(10, 6))
     sns.heatmap(heatmap_data, annot=True, fmt='.0f', cmap='YlOrRd', 
@@ -179,10 +251,10 @@ def main():
     
     # Correlation heatmap
     numeric_cols = ['Price_USD', 'Sales_Volume', 'Mileage_KM', 'Engine_Size_L', 'Year']
-    correlation = df[numeric_cols].corr()
+    correlation_matrix = correlation(frame, backend, numeric_cols)
     
     plt.figure(figsize=(8, 6))
-    sns.heatmap(correlation, annot=True, fmt='.2f', cmap='coolwarm', 
+    sns.heatmap(correlation_matrix, annot=True, fmt='.2f', cmap='coolwarm', 
                 center=0, square=True, linewidths=1)
     plt.title('Correlation Between Variables', fontsize=12)
     plt.tight_layout()
@@ -192,7 +264,8 @@ def main():
     
     # Trends Over Time - Fuel type popularity
     print("\n=== FUEL TYPE TRENDS ===")
-    fuel_yearly = df.groupby(['Year', 'Fuel_Type']).size().reset_index(name='Count')
+    trends = popularity_trends(frame, backend, index=index)
+    fuel_yearly = trends['fuel_yearly']
     
     fig = px.line(fuel_yearly, x='Year', y='Count', color='Fuel_Type',
                   markers=True, title='Fuel Type Popularity Over Time',
@@ -201,8 +274,7 @@ def main():
     fig.show()
     
     # Which models have been most popular over time?
-    top_3_models = df['Model'].value_counts().head(3).index
-    model_yearly = df[df['Model'].isin(top_3_models)].groupby(['Year', 'Model']).size().reset_index(name='Count')
+    model_yearly = trends['model_yearly']
     
     fig = px.line(model_yearly, x='Year', y='Count', color='Model',
                   markers=True, title='Popularity of Top 3 Models Over Time',
@@ -214,12 +286,7 @@ def main():
     print("\n=== REGIONAL COMPARISON ===")
     
     # Compare regions on multiple metrics
-    region_summary = df.groupby('Region').agg({
-        'Sales_Volume': 'sum',
-        'Price_USD': 'mean',
-        'Model': 'count'
-    }).reset_index()
-    region_summary.columns = ['Region', 'Total_Sales', 'Avg_Price', 'Number_of_Records']
+    region_summary = regional_summary(frame, backend).reset_index()
     
     # Total sales by region
     plt.figure(figsize=(10, 6))
@@ -228,7 +295,7 @@ def main():
     plt.title('Total Sales by Region', fontsize=12)
     plt.grid(axis='x', alpha=0.3)
     plt.tight_layout()
-    plt.xlim(41000000, 44000000)
+    plt.xlim(*zoom(region_summary['Total_Sales']))
     plt.show()
     
     # Average price by region
@@ -238,7 +305,7 @@ def main():
     plt.title('Average Price by Region', fontsize=12)
     plt.grid(axis='x', alpha=0.3)
     plt.tight_layout()
-    plt.xlim(74000, 76000)
+    plt.xlim(*zoom(region_summary['Avg_Price']))
     plt.show()
     
     # Number of records (market presence)
@@ -248,40 +315,30 @@ def main():
     plt.title('Market Presence by Region', fontsize=12)
     plt.grid(axis='x', alpha=0.3)
     plt.tight_layout()
-    plt.xlim(8200, 8600)
+    plt.xlim(*zoom(region_summary['Number_of_Records']))
     plt.show()
     
     # Comparing High vs Low Sales Performance
     print("\n=== HIGH VS LOW SALES COMPARISON ===")
     
-    # Compare high vs low sales performance
-    high_sales = df[df['Sales_Classification'] == 'High']
-    low_sales = df[df['Sales_Classification'] == 'Low']
-    
-    # Price comparison
-    plt.figure(figsize=(10, 6))
-    plt.hist([high_sales['Price_USD'], low_sales['Price_USD']], 
-             bins=30, label=['High Sales', 'Low Sales'], color=['green', 'red'], alpha=0.6)
-    plt.xlabel('Price (USD)')
-    plt.title('Price: High vs Low Sales', fontsize=12)
-    plt.legend()
-    plt.grid(alpha=0.3)
-    plt.tight_layout()
-    plt.show()
-    
-    # Sales volume comparison
-    plt.figure(figsize=(10, 6))
-    plt.hist([high_sales['Sales_Volume'], low_sales['Sales_Volume']], 
-             bins=30, label=['High Sales', 'Low Sales'], color=['green', 'red'], alpha=0.6)
-    plt.xlabel('Sales Volume')
-    plt.title('Volume: High vs Low Sales', fontsize=12)
-    plt.legend()
-    plt.grid(alpha=0.3)
-    plt.tight_layout()
-    plt.show()
-    
-    print(f"High Sales Avg Price: ${high_sales['Price_USD'].mean():,.0f}")
-    print(f"Low Sales Avg Price: ${low_sales['Price_USD'].mean():,.0f}")
+    # Compare high vs low sales performance (per-class bin counts over shared edges)
+    high_low = high_low_summary(frame, backend)
+    
+    for column, xlabel, title in [('Price_USD', 'Price (USD)', 'Price: High vs Low Sales'),
+                                  ('Sales_Volume', 'Sales Volume', 'Volume: High vs Low Sales')]:
+        fig, ax = plt.subplots(figsize=(10, 6))
+        plot_histogram(ax, high_low[column], 'High', color='green', alpha=0.6, label='High Sales')
+        plot_histogram(ax, high_low[column], 'Low', color='red', alpha=0.6, label='Low Sales')
+        ax.set_xlabel(xlabel)
+        ax.set_title(title, fontsize=12)
+        ax.legend()
+        ax.grid(alpha=0.3)
+        plt.tight_layout()
+        plt.show()
+    
+    class_price = high_low['avg_price']
+    print(f"High Sales Avg Price: ${class_price['High']:,.0f}")
+    print(f"Low Sales Avg Price: ${class_price['Low']:,.0f}")
     
     # Final Summary Dashboard
     print("\n=== EXECUTIVE SUMMARY DASHBOARD ===")
@@ -291,16 +348,16 @@ def main():
     
     # 1. Top 5 models by sales (top-left)
     ax1 = plt.subplot(2, 2, 1)
-    top_models = df.groupby('Model')['Sales_Volume'].sum().nlargest(5)
+    top_models = model_sales.head(5)
     ax1.barh(top_models.index, top_models.values, color='steelblue')
     ax1.set_xlabel('Total Sales Volume', fontsize=10)
     ax1.set_title('Top 5 Best Selling Models', fontsize=12, fontweight='bold')
     ax1.grid(axis='x', alpha=0.3)
-    ax1.set_xlim(23000000, 24000000)
+    ax1.set_xlim(*zoom(top_models))
     
     # 2. Sales by region (top-right, pie chart)
     ax2 = plt.subplot(2, 2, 2)
-    region_sales = df.groupby('Region')['Sales_Volume'].sum()
+    region_sales = dashboard['region_sales']
     colors = ['#3498db', '#e74c3c', '#2ecc71', '#f39c12', '#9b59b6', '#1abc9c']
     ax2.pie(region_sales, labels=region_sales.index, autopct='%1.1f%%', 
             startangle=90, colors=colors[:len(region_sales)])
@@ -308,16 +365,15 @@ def main():
     
     # 3. Average price by fuel type (bottom-left)
     ax3 = plt.subplot(2, 2, 3)
-    fuel_price = df.groupby('Fuel_Type')['Price_USD'].mean().sort_values()
     ax3.barh(fuel_price.index, fuel_price.values, color='coral')
     ax3.set_xlabel('Average Price (USD)', fontsize=10)
     ax3.set_title('Average Price by Fuel Type', fontsize=12, fontweight='bold')
     ax3.grid(axis='x', alpha=0.3)
-    ax3.set_xlim(74000, 76000)
+    ax3.set_xlim(*zoom(fuel_price))
     
     # 4. Sales trend over years (bottom-right)
     ax4 = plt.subplot(2, 2, 4)
-    yearly = df.groupby('Year')['Sales_Volume'].sum()
+    yearly = yearly_sales
     ax4.plot(yearly.index, yearly.values, marker='o', linewidth=2.5, 
              markersize=8, color='green')
     ax4.set_xlabel('Year', fontsize=10)
@@ -333,9 +389,9 @@ def main():
     plt.show()
     
     print("Dashboard created with 4 key visualizations")
-    print(f"Dataset: {len(df):,} records analyzed")
-    print(f"Time period: {df['Year'].min()}-{df['Year'].max()}")
-    print(f"Total sales volume: {df['Sales_Volume'].sum():,.0f}")
+    print(f"Dataset: {dashboard['records']:,} records analyzed")
+    print(f"Time period: {dashboard['years'][0]}-{dashboard['years'][1]}")
+    print(f"Total sales volume: {dashboard['total_sales']:,.0f}")
 
 
 if __name__ == "__main__":
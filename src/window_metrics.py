@@ -0,0 +1,122 @@
+"""BMW Sales Data - Window Metrics"""
+
+import numpy as np
+import pandas as pd
+
+from backends import get_backend
+
+
+# Each entry is one family of series; combined dimensions give one series per combination,
+# and no dimensions (TOTAL) gives the single all-market series
+TOTAL = ()
+SERIES = [
+    ('Model',),
+    ('Region',),
+    ('Fuel_Type',),
+    ('Model', 'Region', 'Fuel_Type')
+]
+
+
+# Aggregate cube: one row per (series, Year) for every series family, stacked.
+# Member is the display label; Key holds the original dimension values as a tuple.
+# With a lazy backend, df is its lazy frame and only the finest-grain cube is collected.
+def build_cube(df, series=None, backend=None):
+    series = SERIES if series is None else series
+    backend = get_backend('pandas') if backend is None else backend
+    dimensions = sorted({dim for dims in series for dim in dims})
+
+    # Single pass over the rows at the finest grain, then roll up from the cube
+    finest = backend.groupby_agg(df, dimensions + ['Year'], {
+        'Total_Sales': ('Sales_Volume', 'sum'),
+        'Price_Sum': ('Price_USD', 'sum'),
+        'Records': ('Price_USD', 'count')
+    }).reset_index()
+
+    frames = []
+    for dims in series:
+        dims = list(dims)
+        rolled = finest.groupby(dims + ['Year'], observed=True)[['Total_Sales', 'Price_Sum', 'Records']].sum()
+        rolled = rolled.reset_index()
+        if dims:
+            member = rolled[dims[0]].astype(str)
+            for dim in dims[1:]:
+                member = member + ' | ' + rolled[dim].astype(str)
+        else:
+            member = 'All'
+        frames.append(pd.DataFrame({
+            'Dimension': ' x '.join(dims) or 'All',
+            'Member': member,
+            'Key': list(zip(*(rolled[dim] for dim in dims))) or [()] * len(rolled),
+            'Year': rolled['Year'],
+            'Total_Sales': rolled['Total_Sales'],
+            'Avg_Price': rolled['Price_Sum'] / rolled['Records']
+        }))
+
+    return pd.concat(frames, ignore_index=True)
+
+
+# Lay every series out on a (series x year) grid so shifts line up by year.
+# Missing (series, year) cells are NaN; lookup maps cube rows to grid cells.
+# series_keys holds each grid row's dimension values, as in the cube's Key column.
+def cube_to_grids(cube, measures=('Total_Sales', 'Avg_Price')):
+    series_ids, _ = pd.factorize(pd.MultiIndex.from_frame(cube[['Dimension', 'Member']]))
+    _, first_rows = np.unique(series_ids, return_index=True)
+    series_keys = list(cube['Key'].to_numpy()[first_rows])
+    years = np.sort(cube['Year'].unique())
+    year_ids = np.searchsorted(years, cube['Year'].to_numpy())
+
+    grids = {}
+    for measure in measures:
+        grid = np.full((len(series_keys), len(years)), np.nan)
+        grid[series_ids, year_ids] = cube[measure].to_numpy(dtype=float)
+        grids[measure] = grid
+
+    return series_keys, years, grids, (series_ids, year_ids)
+
+
+# Trailing mean over the last `window` columns; NaN unless every value is present
+def _rolling_mean(grid, window):
+    filled = np.nan_to_num(grid)
+    present = (~np.isnan(grid)).astype(int)
+
+    sums = np.cumsum(filled, axis=1)
+    counts = np.cumsum(present, axis=1)
+    sums[:, window:] = sums[:, window:] - sums[:, :-window]
+    counts[:, window:] = counts[:, window:] - counts[:, :-window]
+
+    result = sums / window
+    result[counts < window] = np.nan
+    return result
+
+
+def _yoy_pct(grid):
+    growth = np.full(grid.shape, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth[:, 1:] = (grid[:, 1:] - grid[:, :-1]) / grid[:, :-1] * 100
+    return growth
+
+
+# YoY growth, trailing means and dense ranks for all series at once
+def window_metrics(df, series=None, window=3, backend=None):
+    cube = build_cube(df, series, backend)
+    series_keys, years, grids, lookup = cube_to_grids(cube)
+
+    metrics = cube.copy()
+    metrics['Sales_YoY_Pct'] = _yoy_pct(grids['Total_Sales'])[lookup].round(2)
+    metrics['Price_YoY_Pct'] = _yoy_pct(grids['Avg_Price'])[lookup].round(2)
+    metrics[f'Sales_Rolling_{window}Y'] = _rolling_mean(grids['Total_Sales'], window)[lookup]
+    metrics[f'Price_Rolling_{window}Y'] = _rolling_mean(grids['Avg_Price'], window)[lookup]
+
+    # Dense rank by sales among the members of a dimension in the same year
+    metrics['Sales_Rank'] = metrics.groupby(['Dimension', 'Year'])['Total_Sales'].rank(
+        method='dense', ascending=False).astype(int)
+
+    return metrics.sort_values(['Dimension', 'Member', 'Year']).reset_index(drop=True)
+
+
+# Fastest-growing members of each dimension in the latest year
+def top_movers(metrics, n=3):
+    latest = metrics[metrics['Year'] == metrics['Year'].max()]
+    return (latest.sort_values('Sales_YoY_Pct', ascending=False)
+            .groupby('Dimension', sort=False).head(n)
+            .sort_values(['Dimension', 'Sales_YoY_Pct'], ascending=[True, False]))